@@ -1,19 +1,28 @@
 import os
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, g, has_request_context, request
 from flask_cors import CORS
 from dotenv import load_dotenv
-import pandas_datareader.data as web
-import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta
 import numpy as np
+import orjson
 import threading
+import calendar
+import csv
+import io
+from bisect import bisect_right
+from operator import itemgetter
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import atexit
+import hashlib
+import gzip
 from cache_manager import (
     is_cache_valid, load_from_cache, save_to_cache, 
-    get_cache_age, CACHE_DIR, check_data_changed, clear_data_changed_flag
+    get_cache_age, get_cache_timestamp, CACHE_DIR, check_data_changed, clear_data_changed_flag
 )
 
 # Load environment variables from .env file
@@ -60,122 +69,360 @@ if static_folder_path is None:
 app = Flask(__name__, static_folder=static_folder_path, static_url_path='/')
 CORS(app)  # Allow React to talk to Flask in dev
 
+# Dashboards send X-Client-Visible: false while their tab is hidden. Those polls
+# get cached data but never schedule refreshes, and when no visible client has been
+# seen for a while the refresher stops spending FRED/Yahoo budget.
+CLIENT_IDLE_AFTER = timedelta(minutes=30)
+_last_visible_client = datetime.now()
+
+@app.before_request
+def _stamp_request_time():
+    """Take one clock reading per request so every cache check in it agrees on 'now'"""
+    global _last_visible_client
+    g.now = datetime.now()
+    if client_visible():
+        _last_visible_client = g.now
+
+def client_visible():
+    """False only when the current request says its dashboard tab is hidden"""
+    if not has_request_context():
+        return True
+    return request.headers.get('X-Client-Visible', 'true').lower() != 'false'
+
+def clients_idle():
+    """True when no visible client has made a request for CLIENT_IDLE_AFTER"""
+    return datetime.now() - _last_visible_client >= CLIENT_IDLE_AFTER
+
+def current_time():
+    """The current request's timestamp, or the wall clock outside a request (background threads)"""
+    if has_request_context():
+        return getattr(g, 'now', None) or datetime.now()
+    return datetime.now()
+
+def _dumps(obj):
+    """Serialize to JSON bytes with orjson (handles numpy scalars natively)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+def fast_json(obj):
+    """jsonify replacement serialized with orjson"""
+    return app.response_class(_dumps(obj), mimetype='application/json')
+
 # --- CONFIGURATION ---
 # Get API Key from environment variable (loads from .env file or system env)
 FRED_API_KEY = os.getenv("FRED_API_KEY", "YOUR_API_KEY_HERE")
 
+# Shared HTTP session so every upstream call (FRED, Yahoo, Atlanta Fed) reuses
+# keep-alive connections. Sized for the fetch pool plus concurrent refreshes; idempotent
+# GETs retry twice with a short backoff on connection errors and 5xx responses.
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=16, pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+))
+
+# One long-lived pool for upstream fan-out (FRED series, Yahoo tickers), sized to the
+# HTTP pool above, instead of spinning up fresh threads on every refresh
+_FETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='upstream-fetch')
+atexit.register(_FETCH_POOL.shutdown, wait=False)
+
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+# Multi-series CSV download used by the fredgraph charts (no API key needed)
+FRED_GRAPH_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+
+# Set to 0 when a reverse proxy serves the frontend build (see SERVE FRONTEND below)
+SERVE_FRONTEND = os.getenv("SERVE_FRONTEND", "1") != "0"
+
 # --- CACHING ---
 # CSV-based persistent cache (updates every 3 days)
 # Keep in-memory cache for faster repeated requests within the same session
 CACHE_DURATION = timedelta(minutes=5)
-memory_cache = {
-    'macro': {'data': None, 'timestamp': None},
-    'rates': {'data': None, 'timestamp': None},
-    'fedwatch': {'data': None, 'timestamp': None}
+# Per-endpoint freshness: macro series are monthly, fedwatch moves daily, yields intraday
+CACHE_TTLS = {
+    'macro': timedelta(hours=6),
+    'rates': timedelta(seconds=60),
+    'fedwatch': timedelta(minutes=30),
 }
-cache_lock = threading.Lock()
-
-def get_cached_data(key):
-    """Get cached data from memory cache if it's still valid (short-term cache)"""
-    with cache_lock:
-        cached = memory_cache.get(key)
-        if cached and cached['data'] and cached['timestamp']:
-            age = datetime.now() - cached['timestamp']
-            if age < CACHE_DURATION:
-                return cached['data']
+# Persisted JSON cache files younger than this are served directly when memory misses
+DISK_CACHE_DURATION = timedelta(hours=1)
+# Each entry is an immutable CacheEntry replaced wholesale on write. Swapping a single
+# dict reference is atomic under the GIL, so readers never need to take a lock.
+# The serialized body, its gzip form and its ETag are computed once per write, not per request.
+CacheEntry = namedtuple('CacheEntry', ['data', 'timestamp', 'body', 'gzip_body', 'etag'])
+GZIP_LEVEL = 5
+memory_cache = {}
+
+def cache_ttl(key):
+    """Freshness window for a cache key (CACHE_DURATION if it has no specific TTL)"""
+    return CACHE_TTLS.get(key, CACHE_DURATION)
+
+def get_cached_entry(key):
+    """Get the CacheEntry for key, serving stale entries while a background refresh runs"""
+    entry = memory_cache.get(key)
+    if entry and entry.data:
+        # Stale-while-revalidate: an expired entry is still returned immediately
+        # (hidden clients don't trigger the refresh)
+        if current_time() - entry.timestamp >= cache_ttl(key) and client_visible():
+            refresh_in_background(key)
+        return entry
+    
+    # Memory miss - rehydrate from the persisted cache if it was written recently
+    if is_cache_valid(key, max_age=max(DISK_CACHE_DURATION, cache_ttl(key))):
+        data = load_from_cache(key)
+        if data:
+            # Keep the file's save time so an hour-old copy isn't treated as brand new
+            entry = set_cached_data(key, data, timestamp=get_cache_timestamp(key))
+            if current_time() - entry.timestamp >= cache_ttl(key) and client_visible():
+                refresh_in_background(key)
+            return entry
     return None
 
-def set_cached_data(key, data):
-    """Store data in memory cache (short-term)"""
-    with cache_lock:
-        memory_cache[key] = {'data': data, 'timestamp': datetime.now()}
+def set_cached_data(key, data, timestamp=None):
+    """Store data in memory cache (short-term) and return the new entry"""
+    body = _dumps(data)
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+    entry = CacheEntry(data, current_time() if timestamp is None else timestamp, body, gzip.compress(body, GZIP_LEVEL), etag)
+    memory_cache[key] = entry
+    return entry
+
+def cache_max_age(key, entry):
+    """Seconds of freshness entry has left, for Cache-Control (0 once it is past its TTL)"""
+    remaining = cache_ttl(key) - (current_time() - entry.timestamp)
+    return max(0, int(remaining.total_seconds()))
+
+def cached_response(key, entry):
+    """Serve a cache entry's pre-serialized body, answering 304 when the client's ETag matches"""
+    # Compare the quality, not membership, so "gzip;q=0" counts as a refusal
+    if request.accept_encodings['gzip'] > 0:
+        response = app.response_class(entry.gzip_body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        # Each encoding is a different representation, so it gets its own ETag
+        response.set_etag(entry.etag + '-gz')
+    else:
+        response = app.response_class(entry.body, mimetype='application/json')
+        response.set_etag(entry.etag)
+    response.vary.add('Accept-Encoding')
+    # Browsers and proxies may reuse a response only for the freshness it has left, so a
+    # stale entry served during a background refresh isn't pinned for another full TTL
+    response.headers['Cache-Control'] = f'public, max-age={cache_max_age(key, entry)}'
+    # Werkzeug keeps Vary and Cache-Control when this turns into a 304
+    return response.make_conditional(request)
+
+# Single-flight: concurrent misses for the same key share one upstream fetch
+SINGLE_FLIGHT_TIMEOUT = 60  # seconds a follower waits for the leader's result
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def fetch_single_flight(key, fetch_fn):
+    """Run fetch_fn once per key at a time; concurrent callers wait for and reuse its result"""
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = {'event': threading.Event(), 'result': None}
+            _in_flight[key] = flight
+    
+    if not is_leader:
+        flight['event'].wait(timeout=SINGLE_FLIGHT_TIMEOUT)
+        return flight['result'] or {"error": f"Timed out waiting for {key} data"}
+    
+    try:
+        flight['result'] = fetch_fn()
+        return flight['result']
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+        flight['event'].set()
 
 def compare_data(old_data, new_data):
     """Compare two data objects to detect if there are meaningful changes"""
-    import json
     if old_data is None or new_data is None:
         return False
     
-    # Convert to JSON strings for deep comparison (handles nested dicts)
-    old_str = json.dumps(old_data, sort_keys=True, default=str)
-    new_str = json.dumps(new_data, sort_keys=True, default=str)
-    
-    # For numeric comparison, we'll do a smarter comparison
-    # For now, simple string comparison works for detecting changes
-    return old_str != new_str 
+    # Structural equality walks the nested dicts/lists directly, ignores key order
+    # and stops at the first difference - no serializing either side
+    return old_data != new_data
 
 # --- HELPER FUNCTIONS ---
+def _fred_observations(series_id, start_date, end_date):
+    """Fetch a FRED series from the JSON observations endpoint as parallel (dates, values) lists"""
+    response = http_session.get(FRED_OBSERVATIONS_URL, params={
+        'series_id': series_id,
+        'api_key': FRED_API_KEY,
+        'file_type': 'json',
+        'observation_start': start_date.strftime('%Y-%m-%d'),
+        'observation_end': end_date.strftime('%Y-%m-%d'),
+    }, timeout=10)
+    response.raise_for_status()
+    
+    # Observations come back in chronological order, one per date.
+    # FRED marks missing observations with '.', which are skipped.
+    dates, values = [], []
+    for obs in orjson.loads(response.content)['observations']:
+        if obs['value'] != '.':
+            dates.append(obs['date'])
+            values.append(float(obs['value']))
+    return dates, values
+
+def _fred_latest(series_id):
+    """Most recent valid observation of a FRED series, or None"""
+    # Newest first; a few extra rows skip over holiday placeholders ('.')
+    response = http_session.get(FRED_OBSERVATIONS_URL, params={
+        'series_id': series_id,
+        'api_key': FRED_API_KEY,
+        'file_type': 'json',
+        'sort_order': 'desc',
+        'limit': 10,
+    }, timeout=10)
+    response.raise_for_status()
+    
+    for obs in orjson.loads(response.content)['observations']:
+        if obs['value'] != '.':
+            return float(obs['value'])
+    return None
+
+def _fred_latest_batch(series_ids, start_date, end_date):
+    """Latest value of several FRED series from one fredgraph.csv request, as {series_id: value}"""
+    response = http_session.get(FRED_GRAPH_CSV_URL, params={
+        'id': ','.join(series_ids),
+        'cosd': start_date.strftime('%Y-%m-%d'),
+        'coed': end_date.strftime('%Y-%m-%d'),
+    }, timeout=10)
+    response.raise_for_status()
+    
+    # One date column followed by a column per series; rows are chronological,
+    # so the last non-missing cell in a column is that series' latest value
+    rows = csv.reader(io.StringIO(response.text))
+    header = next(rows)
+    latest = {}
+    for row in rows:
+        for series_id, cell in zip(header[1:], row[1:]):
+            if cell and cell != '.':
+                latest[series_id] = float(cell)
+    return latest
+
+def _months_before(date_str, months):
+    """Return the ISO date `months` calendar months before date_str (day clamped to month end)"""
+    year, month, day = map(int, date_str.split('-'))
+    month -= months
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    day = min(day, calendar.monthrange(year, month)[1])
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+# Yahoo's chart endpoint carries the latest price in its metadata, which is all the
+# dashboard needs, without yfinance's pandas-heavy client
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0'}  # Yahoo rejects the default requests UA
+
+def _yahoo_last_price(symbol):
+    """Latest market price for a Yahoo symbol, or None"""
+    response = http_session.get(YAHOO_CHART_URL.format(symbol=symbol),
+                                params={'range': '5d', 'interval': '1d'},
+                                headers=YAHOO_HEADERS, timeout=5)
+    response.raise_for_status()
+    result = orjson.loads(response.content)['chart']['result']
+    price = result[0]['meta'].get('regularMarketPrice') if result else None
+    return float(price) if price is not None else None
+
+def _yahoo_last_prices(symbols):
+    """Fetch latest prices for several Yahoo symbols concurrently as {symbol: price}"""
+    prices = {}
+    futures = {_FETCH_POOL.submit(_yahoo_last_price, symbol): symbol for symbol in symbols}
+    for future in as_completed(futures):
+        try:
+            price = future.result()
+        except Exception as e:
+            print(f"Error fetching {futures[future]} from Yahoo: {e}")
+            continue
+        if price is not None:
+            prices[futures[future]] = price
+    return prices
+
+# --- YIELD CURVE TABLES ---
+
+# Yahoo Finance tickers (as backup for some maturities)
+YF_YIELD_TICKERS = {
+    '5Y': '^FVX',   # 5-year Treasury Note
+    '10Y': '^TNX',  # 10-year Treasury Note
+    '30Y': '^TYX'   # 30-year Treasury Bond
+}
+
+# FRED API Treasury constant maturity rates
+# Fetching all requested maturities: 1,3,6 mo and 1,3,5,7,20,30 yr
+# Note: 13M doesn't exist in FRED, removed it
+FRED_YIELD_SERIES = {
+    '1M': 'DGS1MO',   # 1-month
+    '3M': 'DGS3MO',   # 3-month
+    '6M': 'DGS6MO',   # 6-month
+    '1Y': 'DGS1',    # 1-year
+    '2Y': 'DGS2',    # 2-year
+    '3Y': 'DGS3',    # 3-year
+    '5Y': 'DGS5',    # 5-year
+    '7Y': 'DGS7',    # 7-year
+    '10Y': 'DGS10',  # 10-year
+    '20Y': 'DGS20',  # 20-year
+    '30Y': 'DGS30'   # 30-year
+}
+
+# Maturity label -> years, used to order the curve
+_MATURITY_YEARS = {
+    '13W': 0.25,
+    '1M': 1 / 12.0, '3M': 0.25, '6M': 0.5,
+    '1Y': 1.0, '2Y': 2.0, '3Y': 3.0, '5Y': 5.0, '7Y': 7.0,
+    '10Y': 10.0, '20Y': 20.0, '30Y': 30.0,
+}
+
+# Every label the curve can contain, ordered by maturity once at import
+_SORTED_LABELS = sorted(set(YF_YIELD_TICKERS) | set(FRED_YIELD_SERIES), key=_MATURITY_YEARS.get)
+
 def get_yield_curve():
     """
     Fetch yield curve data from multiple sources:
-    - yfinance for some maturities
+    - Yahoo Finance for some maturities
     - FRED API for Treasury constant maturity rates
     """
     data = {}
     
-    # Yahoo Finance tickers (as backup for some maturities)
-    yf_tickers = {
-        '5Y': '^FVX',   # 5-year Treasury Note
-        '10Y': '^TNX',  # 10-year Treasury Note
-        '30Y': '^TYX'   # 30-year Treasury Bond
-    }
-    
-    # Fetch from yfinance (as backup)
+    # Fetch from Yahoo (as backup) - all tickers concurrently over the shared session
     try:
-        for label, ticker in yf_tickers.items():
-            # Only use yfinance if FRED data is not available
-            if label not in data:
-                try:
-                    tick = yf.Ticker(ticker)
-                    hist = tick.history(period="1d")
-                    if not hist.empty:
-                        # Yahoo yields are prices (e.g., 4.5), we keep them as is for display
-                        data[label] = float(hist['Close'].iloc[-1])
-                except Exception as e:
-                    print(f"Error fetching {label} ({ticker}) from yfinance: {e}")
+        prices = _yahoo_last_prices(set(YF_YIELD_TICKERS.values()))
+        for label, ticker in YF_YIELD_TICKERS.items():
+            if ticker in prices:
+                # Yahoo yields are prices (e.g., 4.5), we keep them as is for display
+                data[label] = prices[ticker]
     except Exception as e:
-        print(f"Error fetching yields from yfinance: {e}")
+        print(f"Error fetching yields from Yahoo: {e}")
     
-    # FRED API Treasury constant maturity rates
-    # Fetching all requested maturities: 1,3,6 mo and 1,3,5,7,20,30 yr
-    # Note: 13M doesn't exist in FRED, removed it
-    fred_series = {
-        '1M': 'DGS1MO',   # 1-month
-        '3M': 'DGS3MO',   # 3-month
-        '6M': 'DGS6MO',   # 6-month
-        '1Y': 'DGS1',    # 1-year
-        '2Y': 'DGS2',    # 2-year
-        '3Y': 'DGS3',    # 3-year
-        '5Y': 'DGS5',    # 5-year
-        '7Y': 'DGS7',    # 7-year
-        '10Y': 'DGS10',  # 10-year
-        '20Y': 'DGS20',  # 20-year
-        '30Y': 'DGS30'   # 30-year
-    }
+    # Get recent data (look back 30 days to ensure we get the latest available data)
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=30)
     
-    # Fetch from FRED API if key is available
+    # Fetch every FRED maturity in one request
+    missing = FRED_YIELD_SERIES
+    try:
+        latest = _fred_latest_batch(FRED_YIELD_SERIES.values(), start_date, end_date)
+        for label, series_id in FRED_YIELD_SERIES.items():
+            if series_id in latest:
+                data[label] = latest[series_id]
+        # An empty or truncated CSV can still come back 200; only a full set ends here
+        missing = {label: series_id for label, series_id in FRED_YIELD_SERIES.items() if series_id not in latest}
+        if not missing:
+            return data
+        print(f"Batched FRED yields missing {list(missing)}, fetching them per series")
+    except Exception as e:
+        print(f"Error fetching batched yields from FRED, falling back to per-series API: {e}")
+    
+    # Fall back to the FRED API one series at a time if key is available
     if FRED_API_KEY != "YOUR_API_KEY_HERE":
-        try:
-            # Get recent data (look back 30 days to ensure we get the latest available data)
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=30)
-            
-            for label, series_id in fred_series.items():
-                try:
-                    df = web.DataReader(series_id, 'fred', start_date, end_date, api_key=FRED_API_KEY)
-                    if not df.empty:
-                        # Get the most recent non-NaN value
-                        series_data = df[series_id].dropna()
-                        if len(series_data) > 0:
-                            data[label] = float(series_data.iloc[-1])
-                        else:
-                            print(f"Warning: No valid data for {label} ({series_id})")
-                    else:
-                        print(f"Warning: Empty dataframe for {label} ({series_id})")
-                except Exception as e:
-                    print(f"Error fetching {label} ({series_id}) from FRED: {e}")
-        except Exception as e:
-            print(f"Error fetching yields from FRED: {e}")
+        for label, series_id in missing.items():
+            try:
+                value = _fred_latest(series_id)
+                if value is not None:
+                    data[label] = value
+                else:
+                    print(f"Warning: No valid data for {label} ({series_id})")
+            except Exception as e:
+                print(f"Error fetching {label} ({series_id}) from FRED: {e}")
     else:
         print("Warning: FRED_API_KEY not set, skipping FRED yield data")
     
@@ -188,46 +435,154 @@ def calculate_dv01(face_value, duration, yield_percent):
 
 def maturity_to_years(maturity_str):
     """Convert maturity string to years for sorting (e.g., '13W' -> 0.25, '2Y' -> 2)"""
-    if maturity_str.endswith('W'):
-        weeks = int(maturity_str[:-1])
-        return weeks / 52.0
-    elif maturity_str.endswith('M'):
-        months = int(maturity_str[:-1])
-        return months / 12.0
-    elif maturity_str.endswith('Y'):
-        years = int(maturity_str[:-1])
-        return float(years)
-    return 0.0
+    return _MATURITY_YEARS.get(maturity_str, 0.0)
 
 # --- API ENDPOINTS ---
 
+# Series IDs organized by category
+# Inflation Indicators
+# Producer Price Indicators  
+# Employment Indicators
+# Manufacturing Activity & Consumer Sentiment
+MACRO_SERIES = {
+    "CPI": "CPIAUCSL",  # Consumer Price Index
+    "PCE Headline": "PCEPI",     # Personal Consumption Expenditures Price Index (Headline)
+    "PCE Core": "PCECTPI",  # PCE Price Index excluding food and energy (Core)
+    "PPI": "PPIACO",    # Producer Price Index
+    "PMI": "NAPM",  # ISM Manufacturing PMI - will try alternative if this fails
+    "Non-Farm Payrolls": "PAYEMS",  # Non-Farm Payrolls (Total Nonfarm)
+    "Unemployment Rate": "UNRATE",  # Unemployment Rate
+    "Unemployment Claims": "ICSA",  # Initial Jobless Claims, Seasonally Adjusted
+    "JOLTS": "JTSJOL",  # Job Openings: Total Nonfarm (JOLTS)
+    "Consumer Sentiment": "UMCSENT",  # University of Michigan Consumer Sentiment
+    "Consumer Confidence": "CONCCONF",  # Consumer Confidence Index
+}
+
+# Alternative PMI series IDs to try if primary fails
+# Note: Do NOT include UMCSENT (Consumer Sentiment) as it's a different metric
+PMI_ALTERNATIVES = ["MANPMI"]  # Manufacturing PMI alternatives (excluding UMCSENT)
+
+def _fetch_series(name, series_id, start_date, end_date):
+    """Fetch a single FRED series, returning (name, dates, values) or (name, None, None)"""
+    try:
+        # For PMI, try alternatives if primary fails
+        if name == "PMI":
+            dates = None
+            for alt_id in [series_id] + PMI_ALTERNATIVES:
+                try:
+                    dates, values = _fred_observations(alt_id, start_date, end_date)
+                    series_id = alt_id  # Use the working series ID
+                    break
+                except:
+                    continue
+            if not dates:
+                print(f"Warning: Could not fetch PMI data with any series ID")
+                return name, None, None
+        else:
+            # Fetch data from FRED - the observations endpoint returns the latest available data
+            dates, values = _fred_observations(series_id, start_date, end_date)
+        
+        if len(dates) == 0:
+            print(f"Warning: No data found for {name} ({series_id})")
+            return name, None, None
+        return name, dates, np.asarray(values, dtype=np.float64)
+    except Exception as e:
+        print(f"Error fetching {name} ({series_id}): {str(e)}")
+        return name, None, None
+
+def _batch_pct_change(value_arrays):
+    """Period-over-period percent change for several series in one NumPy pass"""
+    # Series have different frequencies, so rather than aligning them on dates they
+    # are laid end to end; the first point of each segment has no previous value
+    # and is reset to 0 after the single vectorized division.
+    lengths = [len(v) for v in value_arrays]
+    starts = np.cumsum([0] + lengths[:-1])
+    flat = np.concatenate(value_arrays)
+    pct = np.zeros_like(flat)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Written straight into pct's tail, so no intermediate quotient array
+        np.divide(np.diff(flat), flat[:-1], out=pct[1:])
+    pct[1:] *= 100
+    pct[starts] = 0
+    np.round(pct, 2, out=pct)
+    return np.split(pct, starts[1:])
+
+def _build_series_payload(name, dates, values, pct_change):
+    """Turn one fetched series and its percent changes into the API payload, or None"""
+    try:
+        # Calculate simple numeric display data
+        latest = float(values[-1])
+        latest_date = dates[-1]
+        prev = float(values[-2]) if len(values) > 1 else latest
+        change = ((latest - prev) / prev) * 100 if prev != 0 else 0
+        
+        # Calculate Year-over-Year (YoY) change for CPI, PCE, PPI, Non-Farm Payrolls, JOLTS
+        yoy_change = None
+        if name in ["CPI", "PCE Headline", "PCE Core", "PPI", "Non-Farm Payrolls", "JOLTS"]:
+            try:
+                # ISO date strings sort chronologically, so bisect finds the
+                # closest observation on or before one year ago
+                idx = bisect_right(dates, _months_before(latest_date, 12)) - 1
+                if idx >= 0:
+                    one_year_value = float(values[idx])
+                    yoy_change = ((latest - one_year_value) / one_year_value) * 100 if one_year_value != 0 else 0
+            except Exception as e:
+                print(f"Error calculating YoY change for {name}: {e}")
+                yoy_change = None
+        
+        # Calculate quarterly change for chart (for CPI, PCE Headline, PCE Core, PPI)
+        quarterly_change_data = None
+        if name in ["CPI", "PCE Headline", "PCE Core", "PPI"]:
+            try:
+                # Index of the closest date on or before 3 months ago, for every point in
+                # one searchsorted call (ISO date strings sort chronologically)
+                targets = [_months_before(d, 3) for d in dates]
+                past_idx = np.searchsorted(dates, targets, side='right') - 1
+                past = values[np.maximum(past_idx, 0)]
+                
+                # Calculate quarterly (3-month) change for each data point (0 with no usable base)
+                valid = (past_idx >= 0) & (past != 0)
+                qtr_change = np.zeros_like(values)
+                np.divide(values - past, past, out=qtr_change, where=valid)
+                qtr_change *= 100
+                np.round(qtr_change, 2, out=qtr_change)
+                
+                quarterly_change_data = [
+                    {'date': d, 'quarterly_change': q}
+                    for d, q in zip(dates, qtr_change.tolist())
+                ]
+            except Exception as e:
+                print(f"Error calculating quarterly changes for {name}: {e}")
+                quarterly_change_data = None
+        
+        # Build history records directly from the arrays (native Python floats for JSON)
+        history_data = [
+            {'date': d, 'value': v, 'pct_change': p}
+            for d, v, p in zip(dates, values.tolist(), pct_change.tolist())
+        ]
+        
+        result_data = {
+            "history": history_data,
+            "current": latest,
+            "latest_date": latest_date,
+            "change": round(change, 2)
+        }
+        
+        # Add YoY change if calculated
+        if yoy_change is not None:
+            result_data["yoy_change"] = round(yoy_change, 2)
+        
+        # Add quarterly change data if calculated
+        if quarterly_change_data is not None:
+            result_data["quarterly_change_history"] = quarterly_change_data
+        
+        return result_data
+    except Exception as e:
+        print(f"Error processing {name}: {str(e)}")
+        return None
+
 def fetch_macro_data():
     """Fetch macro data from FRED (used for caching) - optimized with parallel fetching"""
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
-    # Series IDs organized by category
-    # Inflation Indicators
-    # Producer Price Indicators  
-    # Employment Indicators
-    # Manufacturing Activity & Consumer Sentiment
-    series_map = {
-        "CPI": "CPIAUCSL",  # Consumer Price Index
-        "PCE Headline": "PCEPI",     # Personal Consumption Expenditures Price Index (Headline)
-        "PCE Core": "PCECTPI",  # PCE Price Index excluding food and energy (Core)
-        "PPI": "PPIACO",    # Producer Price Index
-        "PMI": "NAPM",  # ISM Manufacturing PMI - will try alternative if this fails
-        "Non-Farm Payrolls": "PAYEMS",  # Non-Farm Payrolls (Total Nonfarm)
-        "Unemployment Rate": "UNRATE",  # Unemployment Rate
-        "Unemployment Claims": "ICSA",  # Initial Jobless Claims, Seasonally Adjusted
-        "JOLTS": "JTSJOL",  # Job Openings: Total Nonfarm (JOLTS)
-        "Consumer Sentiment": "UMCSENT",  # University of Michigan Consumer Sentiment
-        "Consumer Confidence": "CONCCONF",  # Consumer Confidence Index
-    }
-    
-    # Alternative PMI series IDs to try if primary fails
-    # Note: Do NOT include UMCSENT (Consumer Sentiment) as it's a different metric
-    pmi_alternatives = ["MANPMI"]  # Manufacturing PMI alternatives (excluding UMCSENT)
-    
     response_data = {}
     # Historical data from 18 months ago to reduce load time while maintaining context
     start_date = datetime.now() - timedelta(days=550)  # ~18 months
@@ -240,158 +595,22 @@ def fetch_macro_data():
         # FRED data is typically released mid-month for the previous month
         end_date = datetime.now() + timedelta(days=60)  # Look ahead to catch latest releases
         
-        def fetch_series(name, series_id):
-            """Helper function to fetch a single series"""
-            try:
-                # For PMI, try alternatives if primary fails
-                if name == "PMI":
-                    df = None
-                    for alt_id in [series_id] + pmi_alternatives:
-                        try:
-                            df = web.DataReader(alt_id, 'fred', start_date, end_date, api_key=FRED_API_KEY)
-                            df = df.reset_index()
-                            series_id = alt_id  # Use the working series ID
-                            break
-                        except:
-                            continue
-                    if df is None or len(df) == 0:
-                        print(f"Warning: Could not fetch PMI data with any series ID")
-                        return None
-                else:
-                    # Fetch data from FRED - pandas_datareader will get the latest available data
-                    df = web.DataReader(series_id, 'fred', start_date, end_date, api_key=FRED_API_KEY)
-                    df = df.reset_index()
-                
-                # Drop any NaN values that might be at the end (future dates without data yet)
-                df = df.dropna(subset=[series_id])
-                
-                if len(df) == 0:
-                    print(f"Warning: No data found for {name} ({series_id})")
-                    return None
-                
-                # Sort by date to ensure chronological order
-                df = df.sort_values('DATE')
-                
-                # Remove any duplicate dates (keep last)
-                df = df.drop_duplicates(subset='DATE', keep='last')
-                
-                df['date'] = df['DATE'].dt.strftime('%Y-%m-%d')
-                
-                # Calculate percent change for each data point (period-over-period)
-                df['pct_change'] = df[series_id].pct_change() * 100
-                df['pct_change'] = df['pct_change'].fillna(0)  # First row will be 0 (no previous value)
-                
-                # Calculate simple numeric display data
-                latest = float(df[series_id].iloc[-1])
-                latest_date = df['date'].iloc[-1]
-                prev = float(df[series_id].iloc[-2]) if len(df) > 1 else latest
-                change = ((latest - prev) / prev) * 100 if prev != 0 else 0
-                
-                # Calculate Year-over-Year (YoY) change for CPI, PCE, PPI, Non-Farm Payrolls, JOLTS
-                yoy_change = None
-                if name in ["CPI", "PCE Headline", "PCE Core", "PPI", "Non-Farm Payrolls", "JOLTS"]:
-                    try:
-                        # Find value from 1 year ago (approximately 365 days)
-                        latest_date_obj = pd.to_datetime(latest_date)
-                        one_year_ago = latest_date_obj - pd.DateOffset(years=1)
-                        
-                        # Find closest date to one year ago
-                        df['DATE_dt'] = pd.to_datetime(df['DATE'])
-                        one_year_data = df[df['DATE_dt'] <= one_year_ago]
-                        
-                        if len(one_year_data) > 0:
-                            # Get the closest date to one year ago
-                            one_year_value = float(one_year_data.iloc[-1][series_id])
-                            yoy_change = ((latest - one_year_value) / one_year_value) * 100 if one_year_value != 0 else 0
-                    except Exception as e:
-                        print(f"Error calculating YoY change for {name}: {e}")
-                        yoy_change = None
-                
-                # Calculate quarterly change for chart (for CPI, PCE Headline, PCE Core, PPI)
-                quarterly_change_data = None
-                if name in ["CPI", "PCE Headline", "PCE Core", "PPI"]:
-                    try:
-                        # Ensure DATE_dt exists (might already exist from YoY calculation)
-                        if 'DATE_dt' not in df.columns:
-                            df['DATE_dt'] = pd.to_datetime(df['DATE'])
-                        quarterly_changes = []
-                        
-                        # Calculate quarterly (3-month) change for each data point
-                        for idx in range(len(df)):
-                            try:
-                                current_date = df.iloc[idx]['DATE_dt']
-                                three_months_ago = current_date - pd.DateOffset(months=3)
-                                
-                                # Find closest date to 3 months ago
-                                past_data = df[df['DATE_dt'] <= three_months_ago]
-                                
-                                if len(past_data) > 0:
-                                    past_value = float(past_data.iloc[-1][series_id])
-                                    current_value = float(df.iloc[idx][series_id])
-                                    qtr_change = ((current_value - past_value) / past_value) * 100 if past_value != 0 else 0
-                                    quarterly_changes.append({
-                                        'date': df.iloc[idx]['date'],
-                                        'quarterly_change': round(qtr_change, 2)
-                                    })
-                                else:
-                                    quarterly_changes.append({
-                                        'date': df.iloc[idx]['date'],
-                                        'quarterly_change': 0
-                                    })
-                            except Exception as e:
-                                print(f"Error calculating quarterly change for index {idx} in {name}: {e}")
-                                quarterly_changes.append({
-                                    'date': df.iloc[idx]['date'],
-                                    'quarterly_change': 0
-                                })
-                        
-                        quarterly_change_data = quarterly_changes
-                    except Exception as e:
-                        print(f"Error calculating quarterly changes for {name}: {e}")
-                        quarterly_change_data = None
-                
-                # Convert to native Python types for JSON serialization
-                history_data = df[['date', series_id, 'pct_change']].copy()
-                history_data[series_id] = history_data[series_id].astype(float)
-                history_data['pct_change'] = history_data['pct_change'].astype(float).round(2)
-                
-                # Rename the series_id column to 'value' for easier frontend access
-                history_data = history_data.rename(columns={series_id: 'value'})
-                
-                result_data = {
-                    "history": history_data.to_dict(orient='records'),
-                    "current": latest,
-                    "latest_date": latest_date,
-                    "change": round(change, 2)
-                }
-                
-                # Add YoY change if calculated
-                if yoy_change is not None:
-                    result_data["yoy_change"] = round(yoy_change, 2)
-                
-                # Add quarterly change data if calculated
-                if quarterly_change_data is not None:
-                    result_data["quarterly_change_history"] = quarterly_change_data
-                
-                return {
-                    'name': name,
-                    'data': result_data
-                }
-            except Exception as e:
-                print(f"Error fetching {name} ({series_id}): {str(e)}")
-                return None
-        
         # Fetch all series in parallel for much faster loading
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {executor.submit(fetch_series, name, series_id): name 
-                      for name, series_id in series_map.items()}
-            
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    response_data[result['name']] = result['data']
+        futures = [_FETCH_POOL.submit(_fetch_series, name, series_id, start_date, end_date)
+                   for name, series_id in MACRO_SERIES.items()]
         
-            # All series have been fetched in parallel above
+        fetched = []
+        for future in as_completed(futures):
+            name, dates, values = future.result()
+            if dates:
+                fetched.append((name, dates, values))
+        
+        if fetched:
+            pct_changes = _batch_pct_change([values for _, _, values in fetched])
+            for (name, dates, values), pct_change in zip(fetched, pct_changes):
+                payload = _build_series_payload(name, dates, values, pct_change)
+                if payload:
+                    response_data[name] = payload
     except Exception as e:
         return {"error": str(e)}
         
@@ -401,58 +620,40 @@ def fetch_macro_data():
 def macro_data():
     try:
         # Check memory cache first (for fast repeated requests)
-        cached = get_cached_data('macro')
+        cached = get_cached_entry('macro')
         if cached:
-            return jsonify(cached)
+            return cached_response('macro', cached)
         
         # ALWAYS load from cache first for fast response (even if stale)
         csv_data = load_from_cache('macro')
         if csv_data:
             # Store in memory cache for faster subsequent requests
-            set_cached_data('macro', csv_data)
-            
-            # Always update in background after returning cached data
-            def update_in_background():
-                try:
-                    print("Background: Fetching fresh macro data from API...")
-                    fresh_data = fetch_macro_data()
-                    if 'error' not in fresh_data:
-                        # Compare with cached data
-                        data_changed = compare_data(csv_data, fresh_data)
-                        if data_changed:
-                            print("Background: Macro data has changed, updating cache...")
-                        save_to_cache('macro', fresh_data, data_changed=data_changed)
-                        set_cached_data('macro', fresh_data)
-                except Exception as e:
-                    print(f"Background: Error updating macro data: {e}")
-                    import traceback
-                    traceback.print_exc()
+            csv_entry = set_cached_data('macro', csv_data, timestamp=get_cache_timestamp('macro'))
             
-            # Start background update thread
-            threading.Thread(target=update_in_background, daemon=True).start()
+            # Stale disk data - replace it in the background and keep it current from here on
+            refresh_in_background('macro')
+            start_cache_refresher()
             
             # Return cached data immediately (fast!)
-            return jsonify(csv_data)
+            return cached_response('macro', csv_entry)
         
         # No cache exists, fetch fresh data (shouldn't happen if initial cache files are set up)
         print("No cache found, fetching fresh macro data from API...")
-        response_data = fetch_macro_data()
+        response_data = fetch_single_flight('macro', fetch_macro_data)
         
         # Check if there's an error in the response
         if 'error' in response_data:
             # Return error response with appropriate status code
-            return jsonify(response_data), 400
+            return fast_json(response_data), 400
         
         # Save to CSV cache and memory cache
         save_to_cache('macro', response_data, data_changed=False)
-        set_cached_data('macro', response_data)
-        
-        return jsonify(response_data)
+        return cached_response('macro', set_cached_data('macro', response_data))
     except Exception as e:
         print(f"Error in /api/macro endpoint: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+        return fast_json({"error": f"Internal server error: {str(e)}"}), 500
 
 def fetch_rates_data():
     """Fetch rates data (used for caching)"""
@@ -462,11 +663,16 @@ def fetch_rates_data():
         if not yields:
             return {"error": "Failed to fetch yields"}
 
+        # Bind the curve points used below once
+        y5 = yields.get('5Y', 0)
+        y10 = yields.get('10Y')
+        y30 = yields.get('30Y', 0)
+
         # 1. Curve Shape Analysis (2s10s and 5s30s)
         # Use 2Y if available, otherwise fall back to 1Y, then 3M
         short_term_yield = yields.get('2Y') or yields.get('1Y') or yields.get('3M', 0)
-        spread_2s10s = yields.get('10Y', 0) - short_term_yield
-        spread_5s30s = yields.get('30Y', 0) - yields.get('5Y', 0)
+        spread_2s10s = (y10 or 0) - short_term_yield
+        spread_5s30s = y30 - y5
         
         curve_shape = "Normal"
         trade_pitch = "Bear Flattener (Rates rising)"
@@ -477,14 +683,14 @@ def fetch_rates_data():
 
         # 2. DV01 Example Calculation (for a standard $10M 10Y position)
         # Assuming standard 10Y duration ~8 years
-        dv01 = calculate_dv01(10_000_000, 8.0, yields.get('10Y', 4.0))
+        dv01 = calculate_dv01(10_000_000, 8.0, 4.0 if y10 is None else y10)
 
-        # Sort yields by maturity (convert to years for sorting)
-        sorted_yields = dict(sorted(yields.items(), key=lambda x: maturity_to_years(x[0])))
+        # Walk the precomputed maturity order instead of sorting per request
+        sorted_yields = {k: yields[k] for k in _SORTED_LABELS if k in yields}
         
         # Create yield curve data for charting
         yield_curve_data = [
-            {"maturity": k, "years": maturity_to_years(k), "yield": v}
+            {"maturity": k, "years": _MATURITY_YEARS[k], "yield": v}
             for k, v in sorted_yields.items()
         ]
 
@@ -509,63 +715,43 @@ def fetch_rates_data():
 def rates_analysis():
     try:
         # Check memory cache first (for fast repeated requests)
-        cached = get_cached_data('rates')
+        cached = get_cached_entry('rates')
         if cached:
-            return jsonify(cached)
+            return cached_response('rates', cached)
         
         # ALWAYS load from cache first for fast response (even if stale)
         csv_data = load_from_cache('rates')
         if csv_data:
             # Store in memory cache for faster subsequent requests
-            set_cached_data('rates', csv_data)
-            
-            # Always update in background after returning cached data
-            def update_in_background():
-                try:
-                    print("Background: Fetching fresh rates data from API...")
-                    fresh_data = fetch_rates_data()
-                    if 'error' not in fresh_data:
-                        # Compare with cached data
-                        data_changed = compare_data(csv_data, fresh_data)
-                        if data_changed:
-                            print("Background: Rates data has changed, updating cache...")
-                        save_to_cache('rates', fresh_data, data_changed=data_changed)
-                        set_cached_data('rates', fresh_data)
-                except Exception as e:
-                    print(f"Background: Error updating rates data: {e}")
-                    import traceback
-                    traceback.print_exc()
+            csv_entry = set_cached_data('rates', csv_data, timestamp=get_cache_timestamp('rates'))
             
-            # Start background update thread
-            threading.Thread(target=update_in_background, daemon=True).start()
+            # Stale disk data - replace it in the background and keep it current from here on
+            refresh_in_background('rates')
+            start_cache_refresher()
             
             # Return cached data immediately (fast!)
-            return jsonify(csv_data)
+            return cached_response('rates', csv_entry)
         
         # No cache exists, fetch fresh data (shouldn't happen if initial cache files are set up)
         print("No cache found, fetching fresh rates data from API...")
-        response_data = fetch_rates_data()
+        response_data = fetch_single_flight('rates', fetch_rates_data)
         
         # Check if there's an error in the response
         if 'error' in response_data:
             # Return error response with appropriate status code
-            return jsonify(response_data), 400
+            return fast_json(response_data), 400
         
         # Save to CSV cache and memory cache
         save_to_cache('rates', response_data, data_changed=False)
-        set_cached_data('rates', response_data)
-        
-        return jsonify(response_data)
+        return cached_response('rates', set_cached_data('rates', response_data))
     except Exception as e:
         print(f"Error in /api/rates endpoint: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+        return fast_json({"error": f"Internal server error: {str(e)}"}), 500
 
 def fetch_fedwatch_data():
     """Fetch FedWatch interest rate cut odds - hardcoded data"""
-    from datetime import datetime, timedelta
-    
     # Calculate next FOMC meeting date (January 28, 2026)
     next_meeting = datetime(2026, 1, 28)
     
@@ -576,7 +762,7 @@ def fetch_fedwatch_data():
         "350-375": 81.2
     }
     
-    most_likely = max(target_rate_probabilities.items(), key=lambda x: x[1])
+    most_likely = max(target_rate_probabilities.items(), key=itemgetter(1))
     
     return {
         "next_meeting_date": next_meeting.strftime("%d %b %Y"),  # Format: "28 Jan 2026"
@@ -588,6 +774,51 @@ def fetch_fedwatch_data():
         "source": "FedWatch Data"
     }
 
+def _change_probs_to_target_ranges(current_rate_bps, change_probs):
+    """Map {change_bps: prob} onto 25bp target-rate ranges, sorted ascending, plus the most likely range"""
+    # Fed rates move in 25bp increments - round each range boundary to the nearest 25bp
+    changes = np.fromiter((int(k) for k in change_probs), dtype=np.int32, count=len(change_probs))
+    target_bps = current_rate_bps + changes
+    lowers = np.round((target_bps - 12.5) / 25) * 25
+    uppers = np.round((target_bps + 12.5) / 25) * 25
+    
+    # Sort on the numeric lower bound computed above rather than re-parsing the range keys
+    items = sorted(zip(
+        lowers.astype(int).tolist(),
+        (f"{int(lo)}-{int(hi)}" for lo, hi in zip(lowers, uppers)),
+        change_probs.values()
+    ), key=itemgetter(0))
+    
+    # Build the ordered dict and track the most likely range in the same pass
+    # (strict > keeps the lowest range on ties, as max() over the sorted dict did)
+    sorted_target_rates = {}
+    most_likely = None
+    for _, key, prob in items:
+        sorted_target_rates[key] = prob
+        if most_likely is None or prob > most_likely[1]:
+            most_likely = (key, prob)
+    return sorted_target_rates, most_likely
+
+def _assemble_fedwatch_response(next_meeting_date, current_rate_bps, change_probs, source,
+                                current_fed_rate=None, note=None, all_probabilities=None):
+    """Build the fedwatch payload shared by the Atlanta Fed, market-rate and fallback paths"""
+    sorted_target_rates, most_likely = _change_probs_to_target_ranges(current_rate_bps, change_probs)
+    response = {
+        "next_meeting_date": next_meeting_date,
+        "probabilities": change_probs,
+        "target_rate_probabilities": {k: round(v * 100, 2) for k, v in sorted_target_rates.items()},
+        "most_likely_change": most_likely[0],
+        "most_likely_probability": round(most_likely[1] * 100, 2),
+        "all_probabilities": all_probabilities or {k: round(v * 100, 2) for k, v in change_probs.items()},
+        "source": source,
+    }
+    if current_fed_rate is not None:
+        response["current_fed_rate"] = round(current_fed_rate, 2)
+    response["current_target_rate"] = f"{int(current_rate_bps - 12.5)}-{int(current_rate_bps + 12.5)}"
+    if note:
+        response["note"] = note
+    return response
+
 def fetch_atlanta_fed_probabilities():
     """Fetch probabilities from Atlanta Fed Market Probability Tracker (FREE)"""
     try:
@@ -599,7 +830,7 @@ def fetch_atlanta_fed_probabilities():
             'Accept': 'application/json'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_session.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -616,35 +847,47 @@ def fetch_atlanta_fed_probabilities():
                 change_probs[str(int(rate_change))] = prob
             
             if change_probs:
-                # Convert to target rate ranges
-                target_rate_probs = {}
-                for change_str, prob in change_probs.items():
-                    change_bps = int(change_str)
-                    target_rate_lower = current_rate_bps + change_bps - 12.5
-                    target_rate_upper = current_rate_bps + change_bps + 12.5
-                    target_rate_lower = round(target_rate_lower / 25) * 25
-                    target_rate_upper = round(target_rate_upper / 25) * 25
-                    range_key = f"{int(target_rate_lower)}-{int(target_rate_upper)}"
-                    target_rate_probs[range_key] = prob
-                
-                sorted_target_rates = dict(sorted(target_rate_probs.items(), key=lambda x: int(x[0].split('-')[0])))
-                most_likely = max(sorted_target_rates.items(), key=lambda x: x[1])
-                
-                return {
-                    "next_meeting_date": data.get('meetingDate', 'N/A'),
-                    "probabilities": change_probs,
-                    "target_rate_probabilities": {k: round(v * 100, 2) for k, v in sorted_target_rates.items()},
-                    "most_likely_change": most_likely[0],
-                    "most_likely_probability": round(most_likely[1] * 100, 2),
-                    "all_probabilities": {k: round(v * 100, 2) for k, v in change_probs.items()},
-                    "source": "Atlanta Fed Market Probability Tracker",
-                    "current_target_rate": f"{int(current_rate_bps - 12.5)}-{int(current_rate_bps + 12.5)}"
-                }
+                return _assemble_fedwatch_response(
+                    data.get('meetingDate', 'N/A'), current_rate_bps, change_probs,
+                    "Atlanta Fed Market Probability Tracker"
+                )
     except Exception as e:
         print(f"Error fetching Atlanta Fed data: {e}")
     
     return None
 
+FED_RATE_TTL = timedelta(hours=1)
+
+def _ttl_cache(ttl):
+    """Cache a zero-argument function's non-None result for `ttl`"""
+    def decorator(fn):
+        entry = None  # (value, timestamp), swapped as a whole
+        def wrapper():
+            nonlocal entry
+            current = entry
+            now = current_time()
+            if current is not None and now - current[1] < ttl:
+                return current[0]
+            value = fn()
+            if value is not None:
+                entry = (value, now)
+            return value
+        return wrapper
+    return decorator
+
+@_ttl_cache(FED_RATE_TTL)
+def _current_fed_funds():
+    """Latest effective Fed Funds rate (percent) from FRED, or None"""
+    return _fred_latest('DFF')
+
+@_ttl_cache(FED_RATE_TTL)
+def _current_short_yield():
+    """Latest 13-week T-bill yield (^IRX) from Yahoo, or None"""
+    return _yahoo_last_price('^IRX')
+
+# Rate-change bins (bps) the market-rate model assigns probabilities to
+FED_CHANGE_LABELS = ("-25", "0", "25")
+
 def calculate_fed_probabilities_from_rates():
     """Calculate probabilities based on current Fed Funds rate and market expectations"""
     try:
@@ -652,17 +895,14 @@ def calculate_fed_probabilities_from_rates():
         if FRED_API_KEY != "YOUR_API_KEY_HERE":
             try:
                 # Get current effective Fed Funds rate
-                current_rate_df = web.DataReader('DFF', 'fred', datetime.now() - timedelta(days=30), datetime.now(), api_key=FRED_API_KEY)
-                if not current_rate_df.empty:
-                    current_rate = float(current_rate_df.iloc[-1]['DFF'])
+                current_rate = _current_fed_funds()
+                if current_rate is not None:
                     
                     # Get 2-year Treasury yield as proxy for market expectations
                     # The spread between 2Y yield and Fed Funds rate indicates market expectations
-                    ticker_2y = yf.Ticker('^IRX')  # 13-week T-bill as short-term proxy
-                    hist_2y = ticker_2y.history(period="5d")
+                    short_term_yield = _current_short_yield()  # 13-week T-bill as short-term proxy
                     
-                    if not hist_2y.empty:
-                        short_term_yield = float(hist_2y['Close'].iloc[-1])
+                    if short_term_yield is not None:
                         
                         # Calculate probabilities based on yield curve expectations
                         # If short-term yields are below Fed Funds, market expects cuts
@@ -672,72 +912,38 @@ def calculate_fed_probabilities_from_rates():
                         # Simple probability calculation based on spread
                         # This is a simplified model - real FedWatch uses futures prices
                         # If spread is positive (current rate > market yield), market expects cuts
-                        change_probs = {}
-                        
+                        # Probabilities (and their floors) are ordered as FED_CHANGE_LABELS
                         if spread > 0.15:  # Market expects cuts (yield below Fed Funds)
                             cut_prob = min(0.75, 0.4 + spread * 1.5)
                             hike_prob = max(0.05, 0.3 - spread * 1.0)
-                            no_change_prob = 1.0 - cut_prob - hike_prob
-                            change_probs["-25"] = max(0.1, cut_prob)
-                            change_probs["0"] = max(0.1, no_change_prob)
-                            change_probs["25"] = max(0.05, hike_prob)
+                            probs = np.array([cut_prob, 1.0 - cut_prob - hike_prob, hike_prob])
+                            floors = (0.1, 0.1, 0.05)
                         elif spread < -0.15:  # Market expects hikes (yield above Fed Funds)
                             hike_prob = min(0.75, 0.4 + abs(spread) * 1.5)
                             cut_prob = max(0.05, 0.3 - abs(spread) * 1.0)
-                            no_change_prob = 1.0 - cut_prob - hike_prob
-                            change_probs["-25"] = max(0.05, cut_prob)
-                            change_probs["0"] = max(0.1, no_change_prob)
-                            change_probs["25"] = max(0.1, hike_prob)
+                            probs = np.array([cut_prob, 1.0 - cut_prob - hike_prob, hike_prob])
+                            floors = (0.05, 0.1, 0.1)
                         else:  # Neutral
-                            change_probs["-25"] = 0.3
-                            change_probs["0"] = 0.5
-                            change_probs["25"] = 0.2
+                            probs = np.array([0.3, 0.5, 0.2])
+                            floors = (0.0, 0.0, 0.0)
                         
-                        # Normalize probabilities
-                        total = sum(change_probs.values())
-                        change_probs = {k: v/total for k, v in change_probs.items()}
+                        # Apply floors and normalize in one pass
+                        probs = np.maximum(probs, floors)
+                        probs /= probs.sum()
+                        change_probs = dict(zip(FED_CHANGE_LABELS, probs.tolist()))
                         
                         # Convert to target rate ranges (in basis points)
                         # Current rate is in percentage, convert to bps
                         current_rate_bps = current_rate * 100
                         
-                        # Calculate target rate ranges
-                        target_rate_probs = {}
-                        for change_str, prob in change_probs.items():
-                            change_bps = int(change_str)
-                            # Fed rates are typically in 25bp increments
-                            # Calculate the target rate range
-                            target_rate_lower = current_rate_bps + change_bps - 12.5
-                            target_rate_upper = current_rate_bps + change_bps + 12.5
-                            
-                            # Round to nearest 25bp boundaries
-                            target_rate_lower = round(target_rate_lower / 25) * 25
-                            target_rate_upper = round(target_rate_upper / 25) * 25
-                            
-                            # Format as range string
-                            range_key = f"{int(target_rate_lower)}-{int(target_rate_upper)}"
-                            target_rate_probs[range_key] = prob
-                        
-                        # Sort by target rate (ascending)
-                        sorted_target_rates = dict(sorted(target_rate_probs.items(), key=lambda x: int(x[0].split('-')[0])))
-                        
-                        most_likely = max(sorted_target_rates.items(), key=lambda x: x[1])
-                        
                         # Calculate next FOMC meeting (rough estimate)
-                        today = datetime.now()
+                        today = current_time()
                         next_meeting = today + timedelta(days=30)
                         
-                        return {
-                            "next_meeting_date": next_meeting.strftime("%B %d, %Y"),
-                            "probabilities": change_probs,
-                            "target_rate_probabilities": {k: round(v * 100, 2) for k, v in sorted_target_rates.items()},
-                            "most_likely_change": most_likely[0],
-                            "most_likely_probability": round(most_likely[1] * 100, 2),
-                            "all_probabilities": {k: round(v * 100, 2) for k, v in change_probs.items()},
-                            "source": "Calculated from Market Rates",
-                            "current_fed_rate": round(current_rate, 2),
-                            "current_target_rate": f"{int(current_rate_bps - 12.5)}-{int(current_rate_bps + 12.5)}"
-                        }
+                        return _assemble_fedwatch_response(
+                            next_meeting.strftime("%B %d, %Y"), current_rate_bps, change_probs,
+                            "Calculated from Market Rates", current_fed_rate=current_rate
+                        )
             except Exception as e:
                 print(f"Error calculating from rates: {e}")
     except Exception as e:
@@ -745,12 +951,30 @@ def calculate_fed_probabilities_from_rates():
     
     return None
 
+# Fallback heuristic bands: if the rate is high (>4.5%), more likely to cut; if low (<3%),
+# more likely to hike. The per-band probabilities are constants, so their display
+# percentages are computed once here rather than on every fallback.
+FALLBACK_HIGH_RATE = 4.5
+FALLBACK_LOW_RATE = 3.0
+
+def _fallback_band(change_probs):
+    """Pair a band's probabilities with their rounded display percentages"""
+    return change_probs, {k: round(v * 100, 2) for k, v in change_probs.items()}
+
+_FALLBACK_HIGH = _fallback_band({"-25": 0.6, "0": 0.3, "25": 0.1})
+_FALLBACK_LOW = _fallback_band({"-25": 0.1, "0": 0.3, "25": 0.6})
+_FALLBACK_MID = _fallback_band({"-25": 0.3, "0": 0.4, "25": 0.3})
+
+# Final fallback assumes a ~4.0% (400 bps) rate; only next_meeting_date varies per call
+_NEUTRAL_FALLBACK = _assemble_fedwatch_response(
+    None, 400, {"-25": 0.35, "0": 0.4, "25": 0.25}, "Estimated Probabilities",
+    note="Using estimated probabilities. For real-time data, visit: https://www.atlantafed.org/cenfis/market-probability-tracker"
+)
+
 def fetch_fedwatch_fallback():
     """Fallback: Return estimated probabilities based on general market conditions"""
-    from datetime import datetime, timedelta
-    
     # Calculate next FOMC meeting date
-    today = datetime.now()
+    today = current_time()
     next_meeting = today + timedelta(days=30)
     
     # Get current rates to inform probabilities
@@ -758,125 +982,100 @@ def fetch_fedwatch_fallback():
         # Try to get current Fed Funds rate for better estimates
         if FRED_API_KEY != "YOUR_API_KEY_HERE":
             try:
-                current_rate_df = web.DataReader('DFF', 'fred', datetime.now() - timedelta(days=5), datetime.now(), api_key=FRED_API_KEY)
-                if not current_rate_df.empty:
-                    current_rate = float(current_rate_df.iloc[-1]['DFF'])
+                current_rate = _current_fed_funds()
+                if current_rate is not None:
                     current_rate_bps = current_rate * 100
                     
-                    # Simple heuristic: if rate is high (>4%), more likely to cut; if low (<3%), more likely to hike
-                    if current_rate > 4.5:
-                        change_probs = {"-25": 0.6, "0": 0.3, "25": 0.1}
-                    elif current_rate < 3.0:
-                        change_probs = {"-25": 0.1, "0": 0.3, "25": 0.6}
+                    if current_rate > FALLBACK_HIGH_RATE:
+                        change_probs, change_pcts = _FALLBACK_HIGH
+                    elif current_rate < FALLBACK_LOW_RATE:
+                        change_probs, change_pcts = _FALLBACK_LOW
                     else:
-                        change_probs = {"-25": 0.3, "0": 0.4, "25": 0.3}
-                    
-                    # Convert to target rate ranges
-                    target_rate_probs = {}
-                    for change_str, prob in change_probs.items():
-                        change_bps = int(change_str)
-                        target_rate_lower = current_rate_bps + change_bps - 12.5
-                        target_rate_upper = current_rate_bps + change_bps + 12.5
-                        target_rate_lower = round(target_rate_lower / 25) * 25
-                        target_rate_upper = round(target_rate_upper / 25) * 25
-                        range_key = f"{int(target_rate_lower)}-{int(target_rate_upper)}"
-                        target_rate_probs[range_key] = prob
+                        change_probs, change_pcts = _FALLBACK_MID
                     
-                    sorted_target_rates = dict(sorted(target_rate_probs.items(), key=lambda x: int(x[0].split('-')[0])))
-                    most_likely = max(sorted_target_rates.items(), key=lambda x: x[1])
-                    
-                    return {
-                        "next_meeting_date": next_meeting.strftime("%B %d, %Y"),
-                        "probabilities": change_probs,
-                        "target_rate_probabilities": {k: round(v * 100, 2) for k, v in sorted_target_rates.items()},
-                        "most_likely_change": most_likely[0],
-                        "most_likely_probability": round(most_likely[1] * 100, 2),
-                        "all_probabilities": {k: round(v * 100, 2) for k, v in change_probs.items()},
-                        "source": "Estimated from Current Rates",
-                        "current_fed_rate": round(current_rate, 2),
-                        "current_target_rate": f"{int(current_rate_bps - 12.5)}-{int(current_rate_bps + 12.5)}",
-                        "note": "Probabilities estimated from current Fed Funds rate. For precise probabilities, visit: https://www.atlantafed.org/cenfis/market-probability-tracker"
-                    }
+                    # Target ranges move with the live rate, so only they are computed here
+                    return _assemble_fedwatch_response(
+                        next_meeting.strftime("%B %d, %Y"), current_rate_bps, change_probs,
+                        "Estimated from Current Rates", current_fed_rate=current_rate,
+                        note="Probabilities estimated from current Fed Funds rate. For precise probabilities, visit: https://www.atlantafed.org/cenfis/market-probability-tracker",
+                        all_probabilities=change_pcts
+                    )
             except:
                 pass
     except:
         pass
     
     # Final fallback with neutral probabilities
-    # Assume current rate around 4.0% (400 bps) for fallback
-    current_rate_bps = 400
-    change_probs = {"-25": 0.35, "0": 0.4, "25": 0.25}
-    
-    # Convert to target rate ranges
-    target_rate_probs = {}
-    for change_str, prob in change_probs.items():
-        change_bps = int(change_str)
-        target_rate_lower = current_rate_bps + change_bps - 12.5
-        target_rate_upper = current_rate_bps + change_bps + 12.5
-        target_rate_lower = round(target_rate_lower / 25) * 25
-        target_rate_upper = round(target_rate_upper / 25) * 25
-        range_key = f"{int(target_rate_lower)}-{int(target_rate_upper)}"
-        target_rate_probs[range_key] = prob
-    
-    sorted_target_rates = dict(sorted(target_rate_probs.items(), key=lambda x: int(x[0].split('-')[0])))
-    most_likely = max(sorted_target_rates.items(), key=lambda x: x[1])
-    
-    return {
-        "next_meeting_date": next_meeting.strftime("%B %d, %Y"),
-        "probabilities": change_probs,
-        "target_rate_probabilities": {k: round(v * 100, 2) for k, v in sorted_target_rates.items()},
-        "most_likely_change": most_likely[0],
-        "most_likely_probability": round(most_likely[1] * 100, 2),
-        "all_probabilities": {k: round(v * 100, 2) for k, v in change_probs.items()},
-        "source": "Estimated Probabilities",
-        "current_target_rate": f"{int(current_rate_bps - 12.5)}-{int(current_rate_bps + 12.5)}",
-        "note": "Using estimated probabilities. For real-time data, visit: https://www.atlantafed.org/cenfis/market-probability-tracker"
-    }
+    return {**_NEUTRAL_FALLBACK, "next_meeting_date": next_meeting.strftime("%B %d, %Y")}
 
 @app.route('/api/fedwatch')
 def fedwatch_data():
     # Check memory cache first (for fast repeated requests)
-    cached = get_cached_data('fedwatch')
+    cached = get_cached_entry('fedwatch')
     if cached:
-        return jsonify(cached)
+        return cached_response('fedwatch', cached)
     
     # ALWAYS load from cache first for fast response (even if stale)
     csv_data = load_from_cache('fedwatch')
     if csv_data:
         # Store in memory cache for faster subsequent requests
-        set_cached_data('fedwatch', csv_data)
-        
-        # Always update in background after returning cached data
-        def update_in_background():
-            try:
-                print("Background: Fetching fresh fedwatch data from API...")
-                fresh_data = fetch_fedwatch_data()
-                if 'error' not in fresh_data:
-                    # Compare with cached data
-                    data_changed = compare_data(csv_data, fresh_data)
-                    if data_changed:
-                        print("Background: FedWatch data has changed, updating cache...")
-                    save_to_cache('fedwatch', fresh_data, data_changed=data_changed)
-                    set_cached_data('fedwatch', fresh_data)
-            except Exception as e:
-                print(f"Background: Error updating fedwatch data: {e}")
+        csv_entry = set_cached_data('fedwatch', csv_data, timestamp=get_cache_timestamp('fedwatch'))
         
-        # Start background update thread
-        threading.Thread(target=update_in_background, daemon=True).start()
+        # Stale disk data - replace it in the background and keep it current from here on
+        refresh_in_background('fedwatch')
+        start_cache_refresher()
         
         # Return cached data immediately (fast!)
-        return jsonify(csv_data)
+        return cached_response('fedwatch', csv_entry)
     
     # No cache exists, fetch fresh data (shouldn't happen if initial cache files are set up)
     print("No cache found, fetching fresh fedwatch data from API...")
-    response_data = fetch_fedwatch_data()
+    response_data = fetch_single_flight('fedwatch', fetch_fedwatch_data)
     
     # Save to CSV cache and memory cache
     if 'error' not in response_data:
         save_to_cache('fedwatch', response_data, data_changed=False)
-        set_cached_data('fedwatch', response_data)
+        return cached_response('fedwatch', set_cached_data('fedwatch', response_data))
     
-    return jsonify(response_data)
+    return fast_json(response_data)
+
+# --- AGGREGATED ENDPOINT ---
+POLL_SECTIONS = ('rates', 'macro', 'fedwatch')
+
+@app.route('/api/poll')
+def poll_data():
+    """Return rates, macro and fedwatch in one response, degrading per section"""
+    parts = []
+    etags = []
+    max_ages = []
+    for key in POLL_SECTIONS:
+        try:
+            entry = get_cached_entry(key)
+            if entry is None:
+                # Serve whatever was last persisted and bring it up to date in the background
+                csv_data = load_from_cache(key)
+                entry = set_cached_data(key, csv_data, timestamp=get_cache_timestamp(key)) if csv_data else None
+                refresh_in_background(key)
+                start_cache_refresher()
+        except Exception as e:
+            print(f"Error reading {key} for /api/poll: {e}")
+            entry = None
+        
+        # Splice the pre-serialized section bodies instead of re-encoding them
+        if entry is not None:
+            body, etag = entry.body, entry.etag
+            max_ages.append(cache_max_age(key, entry))
+        else:
+            body, etag = _dumps({"error": f"{key} data unavailable"}), 'unavailable'
+            max_ages.append(0)
+        parts.append(b'"' + key.encode() + b'":' + body)
+        etags.append(etag)
+    
+    response = app.response_class(b'{' + b','.join(parts) + b'}', mimetype='application/json')
+    response.set_etag(hashlib.blake2b('.'.join(etags).encode(), digest_size=8).hexdigest())
+    # The combined payload is only as fresh as its least fresh section
+    response.headers['Cache-Control'] = f'public, max-age={min(max_ages)}'
+    return response.make_conditional(request)
 
 # --- MANUAL UPDATE ENDPOINT (for testing/admin) ---
 @app.route('/api/update-cache')
@@ -923,10 +1122,10 @@ def manual_update_cache():
     except Exception as e:
         results['fedwatch'] = {'status': 'error', 'message': str(e)}
     
-    return jsonify({
+    return fast_json({
         'message': 'Cache update completed',
         'results': results,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': current_time().isoformat()
     })
 
 @app.route('/api/cache-status')
@@ -941,10 +1140,10 @@ def cache_status():
             'age_days': cache_age if cache_age is not None else 'N/A',
             'needs_update': not is_valid if cache_age is not None else True
         }
-    return jsonify({
+    return fast_json({
         'cache_status': status,
         'update_interval_days': 3,
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': current_time().isoformat(),
         'fred_api_key_set': FRED_API_KEY != "YOUR_API_KEY_HERE"
     })
 
@@ -954,187 +1153,181 @@ def clear_cache_endpoint():
     from cache_manager import clear_cache
     try:
         clear_cache()  # Clear all caches
-        return jsonify({
+        return fast_json({
             'message': 'All caches cleared successfully. Next API call will fetch fresh data.',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_time().isoformat()
         })
     except Exception as e:
-        return jsonify({
+        return fast_json({
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_time().isoformat()
         }), 500
 
 # --- SERVE FRONTEND ---
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
+# Single-service deploys (Render) serve the built SPA from this process. Behind a
+# reverse proxy that serves dist/ itself (see nginx.conf), set SERVE_FRONTEND=0 so
+# Flask only answers /api/* and never touches static files.
+# Vite's content-hashed bundles live under /assets and can be cached forever
+IMMUTABLE_ASSET_PREFIX = '/assets/'
+
 def serve(path):
     # Don't serve API routes as static files
     if path.startswith('api/'):
-        return jsonify({"error": "API endpoint not found"}), 404
+        return fast_json({"error": "API endpoint not found"}), 404
     
-    # Check if file exists
-    file_path = os.path.join(app.static_folder, path) if path else os.path.join(app.static_folder, 'index.html')
-    if path and os.path.exists(file_path) and os.path.isfile(file_path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        # Serve index.html for SPA routing
-        index_path = os.path.join(app.static_folder, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(app.static_folder, 'index.html')
-        else:
-            return jsonify({"error": "Frontend not found. Please deploy frontend separately."}), 404
-
-def prewarm_cache():
-    """Pre-warm cache on server start - load from CSV if valid, otherwise fetch fresh"""
-    print("Pre-warming cache...")
+    # Existing files are answered by WhiteNoise before reaching Flask, so anything
+    # that gets here is a client-side route - serve index.html for SPA routing
+    if _INDEX_HTML is None:
+        return fast_json({"error": "Frontend not found. Please deploy frontend separately."}), 404
     
-    # Check and load macro data
-    if is_cache_valid('macro'):
-        data = load_from_cache('macro')
-        if data:
-            set_cached_data('macro', data)
-            cache_age = get_cache_age('macro')
-            print(f"Loaded macro data from cache (age: {cache_age} days)")
-        else:
-            print("Macro cache exists but couldn't load, fetching fresh...")
-            data = fetch_macro_data()
-            if 'error' not in data:
-                save_to_cache('macro', data, data_changed=False)
-                set_cached_data('macro', data)
-    else:
-        print("Macro cache invalid or missing, fetching fresh data...")
-        data = fetch_macro_data()
-        if 'error' not in data:
-            save_to_cache('macro', data, data_changed=False)
-            set_cached_data('macro', data)
+    response = app.response_class(_INDEX_HTML, mimetype='text/html')
+    response.last_modified = _INDEX_MTIME
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def _load_index_html():
+    """Read the built index.html once, returning (bytes, mtime) or (None, None)"""
+    index_path = os.path.join(app.static_folder, 'index.html')
+    if not os.path.isfile(index_path):
+        return None, None
+    with open(index_path, 'rb') as f:
+        return f.read(), datetime.fromtimestamp(os.path.getmtime(index_path))
+
+if SERVE_FRONTEND:
+    # The build is fixed for the life of the process, so the SPA fallback is held in memory
+    _INDEX_HTML, _INDEX_MTIME = _load_index_html()
     
-    # Check and load rates data
-    if is_cache_valid('rates'):
-        data = load_from_cache('rates')
-        if data:
-            set_cached_data('rates', data)
-            cache_age = get_cache_age('rates')
-            print(f"Loaded rates data from cache (age: {cache_age} days)")
-        else:
-            print("Rates cache exists but couldn't load, fetching fresh...")
-            data = fetch_rates_data()
-            if 'error' not in data:
-                save_to_cache('rates', data, data_changed=False)
-                set_cached_data('rates', data)
-    else:
-        print("Rates cache invalid or missing, fetching fresh data...")
-        data = fetch_rates_data()
-        if 'error' not in data:
-            save_to_cache('rates', data, data_changed=False)
-            set_cached_data('rates', data)
+    from whitenoise import WhiteNoise
+    # WhiteNoise indexes the build once at startup and serves files (and their
+    # precompressed variants) without going through Flask's routing
+    app.wsgi_app = WhiteNoise(
+        app.wsgi_app, root=app.static_folder, index_file=True, max_age=60,
+        immutable_file_test=lambda path, url: url.startswith(IMMUTABLE_ASSET_PREFIX)
+    )
+    app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', serve)
+
+def _hydrate_from_disk(data_type):
+    """Load the last persisted copy of a data type into memory, whatever its age"""
+    data = load_from_cache(data_type)
+    if not data:
+        print(f"{data_type.capitalize()} cache missing, the refresher will fetch it")
+        return
+    # Keep the original save time so stale copies are still refreshed promptly
+    set_cached_data(data_type, data, timestamp=get_cache_timestamp(data_type))
+    cache_age = get_cache_age(data_type)
+    print(f"Loaded {data_type} data from cache (age: {cache_age} days)")
+
+# Proactive refresh: re-fetch each data type shortly before its TTL runs out, so
+# requests always read a warm cache instead of waiting on upstream
+REFRESH_TICK = 15  # seconds between checks for entries that are due
+REFRESH_AT = 0.8  # refresh once an entry has used this fraction of its TTL
+REFRESH_FETCHERS = {
+    'macro': fetch_macro_data,
+    'rates': fetch_rates_data,
+    'fedwatch': fetch_fedwatch_data,
+}
+_refresher_started = threading.Event()
+_refresher_lock = threading.Lock()
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+# data_type -> (consecutive failures, time of the last failed attempt); the refresher
+# backs off exponentially, up to one TTL, instead of retrying a failing upstream every tick
+_refresh_failures = {}
+
+def _record_refresh_failure(data_type):
+    """Note a failed refresh so the refresher waits longer before the next attempt"""
+    failures = _refresh_failures.get(data_type, (0, None))[0] + 1
+    _refresh_failures[data_type] = (failures, datetime.now())
+
+def _refresh_backing_off(data_type, now):
+    """Whether data_type failed recently enough that the refresher should skip it"""
+    failed = _refresh_failures.get(data_type)
+    if failed is None:
+        return False
+    failures, last_attempt = failed
+    delay = min(timedelta(seconds=REFRESH_TICK * 2 ** (failures - 1)), cache_ttl(data_type))
+    return now - last_attempt < delay
+
+def refresh_cache(data_type):
+    """Fetch one data type and swap it into the cache if the fetch succeeded"""
+    try:
+        fresh_data = fetch_single_flight(data_type, REFRESH_FETCHERS[data_type])
+        if 'error' in fresh_data:
+            print(f"Refresh: Error fetching {data_type} data: {fresh_data.get('error')}")
+            _record_refresh_failure(data_type)
+            return
+        _refresh_failures.pop(data_type, None)
+        previous = memory_cache.get(data_type)
+        data_changed = previous is None or compare_data(previous.data, fresh_data)
+        if data_changed:
+            print(f"Refresh: {data_type.capitalize()} data has changed, updating cache...")
+        save_to_cache(data_type, fresh_data, data_changed=data_changed)
+        set_cached_data(data_type, fresh_data)
+    except Exception as e:
+        print(f"Refresh: Error updating {data_type} data: {e}")
+        _record_refresh_failure(data_type)
+
+def refresh_in_background(data_type):
+    """Refresh one data type on a daemon thread unless a refresh for it is already running"""
+    with _refreshing_lock:
+        if data_type in _refreshing:
+            return
+        _refreshing.add(data_type)
     
-    # Check and load fedwatch data
-    if is_cache_valid('fedwatch'):
-        data = load_from_cache('fedwatch')
-        if data:
-            set_cached_data('fedwatch', data)
-            cache_age = get_cache_age('fedwatch')
-            print(f"Loaded fedwatch data from cache (age: {cache_age} days)")
-        else:
-            print("Fedwatch cache exists but couldn't load, fetching fresh...")
-            data = fetch_fedwatch_data()
-            if 'error' not in data:
-                save_to_cache('fedwatch', data, data_changed=False)
-                set_cached_data('fedwatch', data)
-    else:
-        print("Fedwatch cache invalid or missing, fetching fresh data...")
-        data = fetch_fedwatch_data()
-        if 'error' not in data:
-            save_to_cache('fedwatch', data, data_changed=False)
-            set_cached_data('fedwatch', data)
+    def run():
+        try:
+            refresh_cache(data_type)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(data_type)
     
-    print("Cache pre-warmed successfully")
+    threading.Thread(target=run, daemon=True).start()
 
-def update_data_worker():
-    """Background worker that checks and updates data when it's older than 3 days"""
-    # Wait a bit before starting to let server initialize
-    time.sleep(60)  # Wait 1 minute after server start
-    
+def cache_refresher():
+    """Daemon loop that refreshes each data type as it nears the end of its TTL"""
     while True:
+        now = datetime.now()
+        idle = clients_idle()
+        for data_type in REFRESH_FETCHERS:
+            if _refresh_backing_off(data_type, now):
+                continue
+            entry = memory_cache.get(data_type)
+            # Missing data is always fetched; due entries only while someone is watching
+            if entry is None or (not idle and now - entry.timestamp >= cache_ttl(data_type) * REFRESH_AT):
+                refresh_in_background(data_type)
+        time.sleep(REFRESH_TICK)
+
+def start_cache_refresher():
+    """Start the cache refresher thread once per process"""
+    if _refresher_started.is_set():
+        return
+    with _refresher_lock:
+        if _refresher_started.is_set():
+            return
+        threading.Thread(target=cache_refresher, daemon=True).start()
+        _refresher_started.set()
+        print("Cache refresher started")
+
+def prewarm_cache():
+    """Pre-warm cache on server start - hydrate from disk, then refresh in the background"""
+    print("Pre-warming cache...")
+    
+    # Disk reads take milliseconds, so last-known-good data is servable right away
+    for data_type in REFRESH_FETCHERS:
         try:
-            print("\n=== Checking if data needs updating ===")
-            updated_any = False
-            
-            # Check and update macro data if needed
-            if not is_cache_valid('macro'):
-                cache_age = get_cache_age('macro')
-                age_msg = f"{cache_age} days old" if cache_age is not None else "missing"
-                print(f"Macro data is {age_msg} (threshold: 3 days), updating...")
-                data = fetch_macro_data()
-                if 'error' not in data:
-                    save_to_cache('macro', data, data_changed=True)
-                    set_cached_data('macro', data)
-                    print("Macro data updated successfully")
-                    updated_any = True
-                else:
-                    print(f"Error updating macro data: {data.get('error')}")
-            else:
-                cache_age = get_cache_age('macro')
-                if cache_age is not None:
-                    print(f"Macro data is fresh (age: {cache_age} days)")
-                else:
-                    print("Macro data is fresh")
-            
-            # Check and update rates data if needed
-            if not is_cache_valid('rates'):
-                cache_age = get_cache_age('rates')
-                age_msg = f"{cache_age} days old" if cache_age is not None else "missing"
-                print(f"Rates data is {age_msg} (threshold: 3 days), updating...")
-                data = fetch_rates_data()
-                if 'error' not in data:
-                    save_to_cache('rates', data, data_changed=True)
-                    set_cached_data('rates', data)
-                    print("Rates data updated successfully")
-                    updated_any = True
-                else:
-                    print(f"Error updating rates data: {data.get('error')}")
-            else:
-                cache_age = get_cache_age('rates')
-                if cache_age is not None:
-                    print(f"Rates data is fresh (age: {cache_age} days)")
-                else:
-                    print("Rates data is fresh")
-            
-            # Check and update fedwatch data if needed
-            if not is_cache_valid('fedwatch'):
-                cache_age = get_cache_age('fedwatch')
-                age_msg = f"{cache_age} days old" if cache_age is not None else "missing"
-                print(f"Fedwatch data is {age_msg} (threshold: 3 days), updating...")
-                data = fetch_fedwatch_data()
-                if 'error' not in data:
-                    save_to_cache('fedwatch', data, data_changed=True)
-                    set_cached_data('fedwatch', data)
-                    print("Fedwatch data updated successfully")
-                    updated_any = True
-                else:
-                    print(f"Error updating fedwatch data: {data.get('error')}")
-            else:
-                cache_age = get_cache_age('fedwatch')
-                if cache_age is not None:
-                    print(f"Fedwatch data is fresh (age: {cache_age} days)")
-                else:
-                    print("Fedwatch data is fresh")
-            
-            if updated_any:
-                print("=== Background data update completed ===\n")
-            else:
-                print("=== All data is up to date ===\n")
-            
-            # Check every 12 hours (in case data needs updating)
-            time.sleep(43200)  # 12 hours
-            
+            _hydrate_from_disk(data_type)
         except Exception as e:
-            print(f"Error in background update worker: {e}")
-            import traceback
-            traceback.print_exc()
-            # Sleep for 1 hour before retrying if there's an error
-            time.sleep(3600)
+            print(f"Error pre-warming {data_type} cache: {e}")
+    
+    print("Cache pre-warmed successfully")
+    
+    # The refresher's first pass fetches anything missing or past its TTL
+    start_cache_refresher()
 
+# Local development entry point. Production runs under gunicorn's gevent worker
+# (see Procfile), which monkey-patches sockets before this module is imported so
+# blocking FRED/Yahoo calls yield to other requests instead of holding the worker.
 if __name__ == '__main__':
     # Pre-warm cache BEFORE starting server to ensure first request is fast
     # Run in background but don't start server until cache is at least partially ready
@@ -1146,10 +1339,5 @@ if __name__ == '__main__':
     # But this ensures cache starts loading immediately
     time.sleep(2)  # Allow 2 seconds for cache to start loading
     
-    # Start background worker to update data every 7 days
-    update_thread = threading.Thread(target=update_data_worker, daemon=True)
-    update_thread.start()
-    print("Background data update worker started (will update every 7 days)")
-    
     port = int(os.environ.get('PORT', 5001))
     app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
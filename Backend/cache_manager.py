@@ -1,7 +1,6 @@
 """CSV-based cache manager for market data"""
 import os
-import json
-import pandas as pd
+import orjson
 from datetime import datetime, timedelta
 import threading
 
@@ -24,27 +23,18 @@ def get_timestamp_path(data_type):
     """Get the path to the timestamp file for a data type"""
     return os.path.join(CACHE_DIR, f'{data_type}_timestamp.txt')
 
-def is_cache_valid(data_type):
-    """Check if cache exists and is less than 3 days old"""
-    timestamp_path = get_timestamp_path(data_type)
-    cache_path = get_cache_path(data_type)
-    
-    # Check if cache files exist
-    if not os.path.exists(cache_path) or not os.path.exists(timestamp_path):
+def is_cache_valid(data_type, max_age=DATA_UPDATE_INTERVAL):
+    """Check if cache exists and is younger than max_age (defaults to the update interval)"""
+    if not os.path.exists(get_cache_path(data_type)):
         return False
     
-    try:
-        # Read timestamp
-        with open(timestamp_path, 'r') as f:
-            timestamp_str = f.read().strip()
-            last_update = datetime.fromisoformat(timestamp_str)
-        
-        # Check if data is older than 3 days
-        age = datetime.now() - last_update
-        return age < DATA_UPDATE_INTERVAL
-    except Exception as e:
-        print(f"Error checking cache validity for {data_type}: {e}")
+    last_update = get_cache_timestamp(data_type)
+    if last_update is None:
         return False
+    
+    # Check if data is older than max_age
+    age = datetime.now() - last_update
+    return age < max_age
 
 def load_from_cache(data_type):
     """Load data from CSV/JSON cache"""
@@ -54,8 +44,8 @@ def load_from_cache(data_type):
         return None
     
     try:
-        with open(cache_path, 'r') as f:
-            data = json.load(f)
+        with open(cache_path, 'rb') as f:
+            data = orjson.loads(f.read())
         print(f"Loaded {data_type} from cache")
         return data
     except Exception as e:
@@ -70,18 +60,19 @@ def save_to_cache(data_type, data, data_changed=False):
     try:
         with cache_lock:
             # Save data as JSON
-            with open(cache_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            with open(cache_path, 'wb') as f:
+                f.write(orjson.dumps(data, default=str, option=orjson.OPT_SERIALIZE_NUMPY))
             
-            # Save timestamp
-            with open(timestamp_path, 'w') as f:
-                f.write(datetime.now().isoformat())
+            # Save timestamp (ISO text, written as ASCII bytes)
+            saved_at = datetime.now().isoformat().encode('ascii')
+            with open(timestamp_path, 'wb') as f:
+                f.write(saved_at)
             
             # If data changed, create/update a data_changed flag file
             if data_changed:
                 changed_flag_path = os.path.join(CACHE_DIR, f'{data_type}_changed.txt')
-                with open(changed_flag_path, 'w') as f:
-                    f.write(datetime.now().isoformat())
+                with open(changed_flag_path, 'wb') as f:
+                    f.write(saved_at)
         
         print(f"Saved {data_type} to cache")
         return True
@@ -103,30 +94,48 @@ def check_data_changed(data_type):
     changed_flag_path = os.path.join(CACHE_DIR, f'{data_type}_changed.txt')
     if os.path.exists(changed_flag_path):
         try:
-            with open(changed_flag_path, 'r') as f:
-                timestamp_str = f.read().strip()
-                return timestamp_str
+            with open(changed_flag_path, 'rb') as f:
+                return f.read().strip().decode('ascii')
         except:
             return None
     return None
 
-def get_cache_age(data_type):
-    """Get the age of cached data in days"""
+# Parsed timestamps keyed by the timestamp file's mtime, so repeated validity checks
+# cost one stat() instead of open + read + fromisoformat. The file's contents stay the
+# source of truth: the seed caches in git get a fresh mtime on every checkout.
+_timestamp_memo = {}
+
+def get_cache_timestamp(data_type):
+    """Get when cached data was last saved, or None if unknown"""
     timestamp_path = get_timestamp_path(data_type)
     
-    if not os.path.exists(timestamp_path):
+    try:
+        mtime_ns = os.stat(timestamp_path).st_mtime_ns
+    except OSError:
         return None
     
+    memo = _timestamp_memo.get(data_type)
+    if memo is not None and memo[0] == mtime_ns:
+        return memo[1]
+    
     try:
-        with open(timestamp_path, 'r') as f:
-            timestamp_str = f.read().strip()
-            last_update = datetime.fromisoformat(timestamp_str)
-        
-        age = datetime.now() - last_update
-        return age.days
+        with open(timestamp_path, 'rb') as f:
+            last_update = datetime.fromisoformat(f.read().strip().decode('ascii'))
     except Exception as e:
-        print(f"Error getting cache age for {data_type}: {e}")
+        print(f"Error reading cache timestamp for {data_type}: {e}")
         return None
+    
+    _timestamp_memo[data_type] = (mtime_ns, last_update)
+    return last_update
+
+def get_cache_age(data_type):
+    """Get the age of cached data in days"""
+    last_update = get_cache_timestamp(data_type)
+    if last_update is None:
+        return None
+    
+    age = datetime.now() - last_update
+    return age.days
 
 def clear_cache(data_type=None):
     """Clear cache for a specific data type or all caches"""
@@ -0,0 +1,8 @@
+"""Gunicorn settings picked up automatically from the Backend directory"""
+import threading
+
+
+def post_worker_init(worker):
+    """Warm the caches in each worker - gunicorn never runs app.py's __main__ block"""
+    from app import prewarm_cache
+    threading.Thread(target=prewarm_cache, daemon=True).start()
@@ -0,0 +1,46 @@
+"""Regenerate _yield_curve_fallback.json from FRED (run at build time, stdlib only)"""
+import csv
+import io
+import json
+import os
+import sys
+import urllib.request
+from datetime import date, timedelta
+
+# Same series as FRED_YIELD_SERIES in shared.py (not imported: shared needs requests)
+FRED_YIELD_SERIES = {
+    '1M': 'DGS1MO', '3M': 'DGS3MO', '6M': 'DGS6MO',
+    '1Y': 'DGS1', '2Y': 'DGS2', '3Y': 'DGS3', '5Y': 'DGS5', '7Y': 'DGS7',
+    '10Y': 'DGS10', '20Y': 'DGS20', '30Y': 'DGS30',
+}
+FRED_GRAPH_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+FALLBACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_yield_curve_fallback.json')
+
+def latest_full_curve():
+    """Return (date, {label: yield}) for the newest day on which every series has a value"""
+    end = date.today()
+    start = end - timedelta(days=30)
+    url = (f"{FRED_GRAPH_CSV_URL}?id={','.join(FRED_YIELD_SERIES.values())}"
+           f"&cosd={start.isoformat()}&coed={end.isoformat()}")
+    with urllib.request.urlopen(url, timeout=15) as response:
+        rows = list(csv.reader(io.StringIO(response.read().decode('utf-8'))))
+
+    # One date column followed by a column per series, oldest row first
+    columns = {series_id: i for i, series_id in enumerate(rows[0])}
+    for row in reversed(rows[1:]):
+        cells = {label: row[columns[series_id]] for label, series_id in FRED_YIELD_SERIES.items()}
+        if all(cell and cell != '.' for cell in cells.values()):
+            return row[0], {label: float(cell) for label, cell in cells.items()}
+    raise ValueError("no day in the last 30 with every maturity")
+
+if __name__ == '__main__':
+    try:
+        as_of, yields = latest_full_curve()
+    except Exception as e:
+        # Never fail the build over this; the committed file stays in place
+        print(f"Keeping existing fallback yield curve, FRED fetch failed: {e}")
+        sys.exit(0)
+    with open(FALLBACK_PATH, 'w') as f:
+        json.dump(yields, f, indent=2)
+        f.write('\n')
+    print(f"Wrote fallback yield curve for {as_of} ({len(yields)} maturities)")
@@ -1,62 +1,36 @@
 """Vercel serverless function for macro data"""
 from http.server import BaseHTTPRequestHandler
-import json
+import orjson
+import hashlib
+import gzip
 import os
 import sys
+import threading
+import time
+import traceback
 
-# Fix for Python 3.12+ where distutils was removed
-try:
-    import distutils
-except ImportError:
-    try:
-        import setuptools
-        sys.modules['distutils'] = setuptools
-        sys.modules['distutils.util'] = setuptools.util
-        sys.modules['distutils.version'] = setuptools.version
-    except ImportError:
-        class DistutilsStub:
-            class util:
-                @staticmethod
-                def strtobool(val):
-                    val = val.lower()
-                    if val in ('y', 'yes', 't', 'true', 'on', '1'):
-                        return 1
-                    elif val in ('n', 'no', 'f', 'false', 'off', '0'):
-                        return 0
-                    else:
-                        raise ValueError(f"invalid truth value {val!r}")
-            class version:
-                class LooseVersion:
-                    def __init__(self, v):
-                        self.v = v
-                    def __str__(self):
-                        return str(self.v)
-        sys.modules['distutils'] = DistutilsStub()
-        sys.modules['distutils.util'] = DistutilsStub.util
-        sys.modules['distutils.version'] = DistutilsStub.version
+# Imported at module load so the cost lands in the cold-start init phase rather than
+# on the first request
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bisect import bisect_right
+from urllib.parse import urlsplit, parse_qs
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 
-# Lazy imports to avoid failures at module load time
-_datetime = None
-_timedelta = None
-_ThreadPoolExecutor = None
-_as_completed = None
-_web = None
-_pd = None
+FRED_OBSERVATIONS_URL = 'https://api.stlouisfed.org/fred/series/observations'
 
-def _import_dependencies():
-    """Lazy import of dependencies"""
-    global _datetime, _timedelta, _ThreadPoolExecutor, _as_completed, _web, _pd
-    if _datetime is not None:
-        return
-    
-    try:
-        from datetime import datetime as _datetime, timedelta as _timedelta
-        from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor, as_completed as _as_completed
-        import pandas_datareader.data as _web
-        import pandas as _pd
-    except ImportError as e:
-        print(f"Failed to import dependencies: {e}")
-        raise
+# Pooled keep-alive session shared by the parallel series fetches
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504))
+))
+
+# Long-lived pool, reused by warm invocations, wide enough to request every series at once
+_FETCH_POOL = ThreadPoolExecutor(max_workers=12, thread_name_prefix='fred-fetch')
 
 # Add api directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -67,12 +41,31 @@ if current_dir not in sys.path:
 def _get_fred_api_key():
     return os.getenv("FRED_API_KEY", "YOUR_API_KEY_HERE")
 
+def _fred_observations(series_id, start_date, end_date, api_key):
+    """Fetch a FRED series from the JSON observations endpoint as parallel (dates, values) lists"""
+    response = _SESSION.get(FRED_OBSERVATIONS_URL, params={
+        'series_id': series_id,
+        'api_key': api_key,
+        'file_type': 'json',
+        'observation_start': start_date.strftime('%Y-%m-%d'),
+        'observation_end': end_date.strftime('%Y-%m-%d'),
+    }, timeout=8)
+    response.raise_for_status()
+    
+    # FRED marks missing observations with '.', which are skipped
+    dates, values = [], []
+    for obs in orjson.loads(response.content)['observations']:
+        if obs['value'] != '.':
+            dates.append(obs['date'])
+            values.append(float(obs['value']))
+    return dates, values
+
+# FRED ID that last returned PMI data; remembered across warm invocations
+_pmi_series_id = None
+
 def fetch_macro_data():
     """Fetch macro data from FRED - optimized with parallel fetching"""
     try:
-        # Import dependencies lazily
-        _import_dependencies()
-        
         series_map = {
             "CPI": "CPIAUCSL",
             "PCE Headline": "PCEPI",
@@ -92,7 +85,7 @@ def fetch_macro_data():
         pmi_alternatives = ["MANPMI"]  # Manufacturing PMI alternatives (excluding UMCSENT)
         response_data = {}
         FRED_API_KEY = _get_fred_api_key()
-        start_date = _datetime.now() - _timedelta(days=550)  # ~18 months
+        start_date = datetime.now() - timedelta(days=550)  # ~18 months
         
         if FRED_API_KEY == "YOUR_API_KEY_HERE":
             # Return empty data instead of error - macro data requires FRED API key
@@ -101,61 +94,64 @@ def fetch_macro_data():
 
         def fetch_series(name, series_id):
             """Helper function to fetch a single series"""
+            global _pmi_series_id
             try:
-                end_date = _datetime.now() + _timedelta(days=60)
+                end_date = datetime.now() + timedelta(days=60)
                 
                 if name == "PMI":
-                    df = None
-                    for alt_id in [series_id] + pmi_alternatives:
+                    observations = None
+                    # Try the ID that worked last time first, so warm invocations skip
+                    # the discontinued series instead of paying a failed round trip for it
+                    candidates = sorted([series_id] + pmi_alternatives, key=lambda c: c != _pmi_series_id)
+                    for alt_id in candidates:
                         try:
-                            df = _web.DataReader(alt_id, 'fred', start_date, end_date, api_key=FRED_API_KEY)
-                            df = df.reset_index()
-                            series_id = alt_id
+                            observations = _fred_observations(alt_id, start_date, end_date, FRED_API_KEY)
+                            series_id = _pmi_series_id = alt_id
                             break
                         except:
                             continue
-                    if df is None or len(df) == 0:
+                    if observations is None or len(observations[0]) == 0:
                         return None
                 else:
-                    df = _web.DataReader(series_id, 'fred', start_date, end_date, api_key=FRED_API_KEY)
-                    df = df.reset_index()
+                    observations = _fred_observations(series_id, start_date, end_date, FRED_API_KEY)
                 
-                df = df.dropna(subset=[series_id])
-                if len(df) == 0:
+                dates, values = observations
+                if len(values) == 0:
                     return None
                 
-                df = df.sort_values('DATE')
-                df = df.drop_duplicates(subset='DATE', keep='last')
-                df['date'] = df['DATE'].dt.strftime('%Y-%m-%d')
-                df['pct_change'] = df[series_id].pct_change() * 100
-                df['pct_change'] = df['pct_change'].fillna(0)
+                # FRED returns one observation per date in chronological order, so the
+                # values can go straight into an array without sorting or de-duplicating
+                vals = np.array(values, dtype=np.float64)
+                pct = np.zeros_like(vals)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    np.divide(vals[1:] - vals[:-1], vals[:-1], out=pct[1:])
+                pct *= 100
+                pct[np.isnan(pct)] = 0
+                np.round(pct, 2, out=pct)
                 
-                latest = float(df[series_id].iloc[-1])
-                latest_date = df['date'].iloc[-1]
-                prev = float(df[series_id].iloc[-2]) if len(df) > 1 else latest
+                latest = float(vals[-1])
+                latest_date = dates[-1]
+                prev = float(vals[-2]) if len(vals) > 1 else latest
                 change = ((latest - prev) / prev) * 100 if prev != 0 else 0
                 
                 # Calculate YoY change
                 yoy_change = None
                 if name in ["CPI", "PCE Headline", "PCE Core", "PPI", "Non-Farm Payrolls", "JOLTS"]:
-                    try:
-                        latest_date_obj = _pd.to_datetime(latest_date)
-                        one_year_ago = latest_date_obj - _pd.DateOffset(years=1)
-                        df['DATE_dt'] = _pd.to_datetime(df['DATE'])
-                        one_year_data = df[df['DATE_dt'] <= one_year_ago]
-                        if len(one_year_data) > 0:
-                            one_year_value = float(one_year_data.iloc[-1][series_id])
-                            yoy_change = ((latest - one_year_value) / one_year_value) * 100 if one_year_value != 0 else 0
-                    except Exception as e:
-                        print(f"Error calculating YoY change for {name}: {e}")
+                    # ISO dates sort as strings; the same day last year (even a missing
+                    # Feb 29) bisects to the last observation on or before it
+                    one_year_ago = f"{int(latest_date[:4]) - 1}{latest_date[4:]}"
+                    idx = bisect_right(dates, one_year_ago) - 1
+                    if idx >= 0:
+                        one_year_value = float(vals[idx])
+                        yoy_change = ((latest - one_year_value) / one_year_value) * 100 if one_year_value != 0 else 0
                 
-                history_data = df[['date', series_id, 'pct_change']].copy()
-                history_data[series_id] = history_data[series_id].astype(float)
-                history_data['pct_change'] = history_data['pct_change'].astype(float).round(2)
-                history_data = history_data.rename(columns={series_id: 'value'})
+                history = [
+                    {'date': d, 'value': v, 'pct_change': c}
+                    for d, v, c in zip(dates, vals.tolist(), pct.tolist())
+                ]
                 
                 result_data = {
-                    "history": history_data.to_dict(orient='records'),
+                    "history": history,
                     "current": latest,
                     "latest_date": latest_date,
                     "change": round(change, 2)
@@ -171,33 +167,102 @@ def fetch_macro_data():
     
         try:
             # Fetch all series in parallel
-            with _ThreadPoolExecutor(max_workers=8) as executor:
-                futures = {executor.submit(fetch_series, name, series_id): name 
-                          for name, series_id in series_map.items()}
-                
-                for future in _as_completed(futures):
-                    try:
-                        result = future.result()
-                        if result:
-                            response_data[result['name']] = result['data']
-                    except Exception as e:
-                        print(f"Error getting result from future: {e}")
-                        continue
+            futures = {_FETCH_POOL.submit(fetch_series, name, series_id): name 
+                      for name, series_id in series_map.items()}
+            
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                    if result:
+                        response_data[result['name']] = result['data']
+                except Exception as e:
+                    print(f"Error getting result from future: {e}")
+                    continue
         except Exception as e:
-            import traceback
             print(f"Error in fetch_macro_data: {e}")
             traceback.print_exc()
             return {"error": f"Failed to fetch macro data: {str(e)}"}
         
         return response_data
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        traceback_str = traceback.format_exc()
         print(f"Error in fetch_macro_data (outer): {error_msg}")
-        print(traceback_str)
+        traceback.print_exc()
         return {"error": f"Failed to fetch macro data: {error_msg}"}
 
+# Warm containers are reused across invocations, and FRED series update at most daily,
+# so the serialized payload is kept for a while instead of re-fetching every request
+MACRO_CACHE_TTL = 900  # seconds
+GZIP_LEVEL = 5  # compressed once per fetch, so a mid level is plenty
+MAX_HISTORY_VARIANTS = 8  # distinct ?history= lengths kept encoded per fetch
+# "bodies" maps a history length (None = full history) to (body, gzip_body, etag)
+_macro_cache = {"ts": 0.0, "data": None, "bodies": {}}
+_macro_cache_lock = threading.Lock()
+
+def _encode_payload(data):
+    """Serialize a macro payload once as (body, gzip_body, etag)"""
+    # orjson emits bytes directly and handles leftover numpy scalars natively
+    body = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    # The history rows compress several-fold; do it once here rather than per request
+    gzip_body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body, gzip_body, etag
+
+def _trim_history(data, history):
+    """Keep only the last `history` points of each series (0 drops the history key)"""
+    trimmed = {}
+    for name, series in data.items():
+        if history:
+            trimmed[name] = {**series, "history": series["history"][-history:]}
+        else:
+            trimmed[name] = {k: v for k, v in series.items() if k != "history"}
+    return trimmed
+
+def get_macro_body(history=None):
+    """Return (body, gzip_body, etag, None) for the macro payload, or (None, None, None, data) if the fetch failed"""
+    # Held across the fetch so concurrent requests on a cold cache share one FRED round
+    with _macro_cache_lock:
+        if _macro_cache["data"] is None or time.monotonic() - _macro_cache["ts"] >= MACRO_CACHE_TTL:
+            data = fetch_macro_data()
+            if not data or 'error' in data:
+                return None, None, None, data
+            _macro_cache.update(ts=time.monotonic(), data=data, bodies={None: _encode_payload(data)})
+        
+        bodies = _macro_cache["bodies"]
+        encoded = bodies.get(history)
+        if encoded is None:
+            encoded = _encode_payload(_trim_history(_macro_cache["data"], history))
+            if len(bodies) < MAX_HISTORY_VARIANTS:
+                bodies[history] = encoded
+        return (*encoded, None)
+
+def _history_param(path):
+    """Parse ?history=N from the request path; None (full history) if absent or invalid"""
+    values = parse_qs(urlsplit(path).query).get('history')
+    if not values:
+        return None
+    try:
+        history = int(values[0])
+    except ValueError:
+        return None
+    return history if history >= 0 else None
+
+def _accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip; a q of 0 means it is refused"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
 class handler(BaseHTTPRequestHandler):
     def log_message(self, format, *args):
         """Override to prevent logging errors"""
@@ -205,11 +270,11 @@ class handler(BaseHTTPRequestHandler):
     
     def do_GET(self):
         try:
-            # Fetch fresh data (no caching in serverless - Vercel handles it at CDN level)
-            data = fetch_macro_data()
+            # Optional ?history=N trims each series to its last N points (0 = summary only)
+            response_data, gzip_body, etag, data = get_macro_body(_history_param(self.path))
             
             # Check if data is empty (no FRED API key) or has error
-            if not data or 'error' in data:
+            if response_data is None:
                 # Return 200 with empty data or error message (not 500)
                 # Frontend can handle empty data gracefully
                 self.send_response(200)
@@ -217,32 +282,51 @@ class handler(BaseHTTPRequestHandler):
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
                 if 'error' in data:
-                    self.wfile.write(json.dumps(data).encode('utf-8'))
+                    self.wfile.write(orjson.dumps(data))
                 else:
                     # Return empty object if no data (FRED API key missing)
-                    self.wfile.write(json.dumps({}).encode('utf-8'))
+                    self.wfile.write(b'{}')
+                return
+            
+            # Each encoding is a distinct representation, so it gets its own ETag
+            use_gzip = _accepts_gzip(self.headers.get('Accept-Encoding', ''))
+            if use_gzip:
+                response_data, etag = gzip_body, etag[:-1] + '-gz"'
+            
+            # Client already has this data - skip resending the history payload, but keep
+            # the caching policy so a CDN revalidation doesn't lose it
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Cache-Control', 'public, s-maxage=900, max-age=900')
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
                 return
             
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
-            # Add cache headers for Vercel edge caching (5 minutes)
-            self.send_header('Cache-Control', 'public, s-maxage=300, max-age=300')
+            # Add cache headers for Vercel edge caching (15 minutes)
+            self.send_header('Cache-Control', 'public, s-maxage=900, max-age=900')
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(response_data)))
             self.end_headers()
-            response_data = json.dumps(data).encode('utf-8')
             self.wfile.write(response_data)
         except Exception as e:
-            import traceback
             error_msg = str(e)
-            traceback_str = traceback.format_exc()
             print(f"Error in /api/macro handler: {error_msg}")
-            print(traceback_str)
+            traceback.print_exc()
             try:
                 self.send_response(500)
                 self.send_header('Content-Type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
-                error_response = json.dumps({"error": error_msg, "traceback": traceback_str}).encode('utf-8')
+                # The traceback stays in the logs; clients only get the message
+                error_response = orjson.dumps({"error": f"Internal server error: {error_msg}"})
                 self.wfile.write(error_response)
             except:
                 # If we can't send response, just log it
@@ -250,10 +334,12 @@ class handler(BaseHTTPRequestHandler):
     
     def do_OPTIONS(self):
         try:
-            self.send_response(200)
+            self.send_response(204)
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            # Let browsers reuse the preflight for a day instead of repeating it per call
+            self.send_header('Access-Control-Max-Age', '86400')
             self.end_headers()
         except:
             pass
@@ -1,50 +1,44 @@
 """Vercel serverless function for rates data"""
 from http.server import BaseHTTPRequestHandler
-import json
+import orjson
+import hashlib
 import sys
 import os
+import threading
+import time
+import traceback
 
 # Add api directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Lazy import to avoid import errors at module load time
-_shared_imported = False
-_get_yield_curve = None
-_maturity_to_years = None
-_calculate_dv01 = None
-
-def _import_shared():
-    """Lazy import of shared functions"""
-    global _shared_imported, _get_yield_curve, _maturity_to_years, _calculate_dv01
-    if _shared_imported:
-        return
-    
+# Resolve the shared helpers once at module load. A failure is remembered rather than
+# raised, so the handler can still answer with the usual error payload.
+try:
+    from shared import (
+        get_yield_curve_with_source as _get_yield_curve,
+        maturity_to_years as _maturity_to_years,
+        calculate_dv01 as _calculate_dv01,
+    )
+    _shared_imported = True
+except ImportError:
     try:
-        from shared import get_yield_curve, maturity_to_years, calculate_dv01
-        _get_yield_curve = get_yield_curve
-        _maturity_to_years = maturity_to_years
-        _calculate_dv01 = calculate_dv01
+        from api.shared import (
+            get_yield_curve_with_source as _get_yield_curve,
+            maturity_to_years as _maturity_to_years,
+            calculate_dv01 as _calculate_dv01,
+        )
         _shared_imported = True
-    except ImportError:
-        try:
-            from api.shared import get_yield_curve, maturity_to_years, calculate_dv01
-            _get_yield_curve = get_yield_curve
-            _maturity_to_years = maturity_to_years
-            _calculate_dv01 = calculate_dv01
-            _shared_imported = True
-        except ImportError as e:
-            print(f"Failed to import shared functions: {e}")
-            raise
+    except ImportError as e:
+        print(f"Failed to import shared functions: {e}")
+        _get_yield_curve = _maturity_to_years = _calculate_dv01 = None
+        _shared_imported = False
 
 def fetch_rates_data():
     """Fetch rates data"""
     try:
-        # Import shared functions lazily
-        _import_shared()
-        
-        if not _shared_imported or not _get_yield_curve:
+        if not _shared_imported:
             # Return consistent structure even on error
             return {
                 "yields": {},
@@ -59,7 +53,7 @@ def fetch_rates_data():
                 "error": "Failed to import required functions"
             }
         
-        yields = _get_yield_curve()
+        yields, source = _get_yield_curve()
         
         if not yields:
             # Return consistent structure even on error
@@ -77,8 +71,9 @@ def fetch_rates_data():
             }
 
         # Curve Shape Analysis
+        y10 = yields.get('10Y')
         short_term_yield = yields.get('2Y') or yields.get('1Y') or yields.get('3M', 0)
-        spread_2s10s = yields.get('10Y', 0) - short_term_yield
+        spread_2s10s = (y10 or 0) - short_term_yield
         spread_5s30s = yields.get('30Y', 0) - yields.get('5Y', 0)
         
         curve_shape = "Normal"
@@ -89,18 +84,19 @@ def fetch_rates_data():
             trade_pitch = "Bull Steepener (Expecting cuts)"
 
         # DV01 Calculation
-        dv01 = _calculate_dv01(10_000_000, 8.0, yields.get('10Y', 4.0))
+        dv01 = _calculate_dv01(10_000_000, 8.0, 4.0 if y10 is None else y10)
 
-        # Sort yields by maturity
-        sorted_yields = dict(sorted(yields.items(), key=lambda x: _maturity_to_years(x[0])))
+        # Sort yields by maturity, converting each label to years only once
+        by_maturity = sorted((_maturity_to_years(k), k, v) for k, v in yields.items())
+        sorted_yields = {k: v for _, k, v in by_maturity}
         
         # Create yield curve data for charting
         yield_curve_data = [
-            {"maturity": k, "years": _maturity_to_years(k), "yield": v}
-            for k, v in sorted_yields.items()
+            {"maturity": k, "years": years, "yield": v}
+            for years, k, v in by_maturity
         ]
 
-        return {
+        result = {
             "yields": sorted_yields,
             "yield_curve": yield_curve_data,
             "analysis": {
@@ -111,12 +107,15 @@ def fetch_rates_data():
                 "dv01_10m_position": f"${dv01:,.2f}"
             }
         }
+        # Live sources failed and these are the bundled last-known yields
+        if source == 'fallback':
+            result["stale"] = True
+            result["source"] = "fallback"
+        return result
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        traceback_str = traceback.format_exc()
         print(f"Error in fetch_rates_data: {error_msg}")
-        print(traceback_str)
+        traceback.print_exc()
         # Return consistent structure even on error
         return {
             "yields": {},
@@ -131,6 +130,29 @@ def fetch_rates_data():
             "error": f"Failed to fetch rates data: {error_msg}"
         }
 
+# Warm containers are reused across invocations, so the serialized payload is kept
+# for the same 5 minutes the CDN caches it instead of re-fetching every request
+RATES_CACHE_TTL = 300  # seconds
+_rates_cache = {"ts": 0.0, "body": None, "etag": None}
+_rates_cache_lock = threading.Lock()
+
+def get_rates_body():
+    """Return (body, etag, data) for the rates payload; data is None on a cache hit"""
+    # Held across the fetch so concurrent requests on a cold cache share one upstream round
+    with _rates_cache_lock:
+        if _rates_cache["body"] is not None and time.monotonic() - _rates_cache["ts"] < RATES_CACHE_TTL:
+            return _rates_cache["body"], _rates_cache["etag"], None
+        
+        data = fetch_rates_data()
+        # Yields can come back as numpy scalars; orjson encodes them natively
+        body = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        # Error and fallback payloads are still served, just never cached, so the next
+        # request tries the live sources again
+        if 'error' not in data and not data.get('stale'):
+            _rates_cache.update(ts=time.monotonic(), body=body, etag=etag)
+        return body, etag, data
+
 class handler(BaseHTTPRequestHandler):
     def log_message(self, format, *args):
         """Override to prevent logging errors"""
@@ -138,35 +160,51 @@ class handler(BaseHTTPRequestHandler):
     
     def do_GET(self):
         try:
-            data = fetch_rates_data()
+            response_data, etag, data = get_rates_body()
             
             # Return 200 even if there's an error - let frontend handle it
             # Only return 500 for actual server exceptions
             status_code = 200
-            if 'error' in data:
+            if data is not None and 'error' in data:
                 # Log the error but still return 200 so frontend can handle gracefully
                 print(f"Error in rates data: {data.get('error')}")
             
+            if data is not None and data.get('stale'):
+                # Bundled fallback yields must not sit in the edge cache in place of live ones
+                cache_control = 'no-store'
+            else:
+                # Add cache headers for Vercel edge caching (5 minutes)
+                cache_control = 'public, s-maxage=300, max-age=300'
+            
+            # Client already has these yields - skip resending them, but keep the caching
+            # policy so a CDN revalidation doesn't lose it
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Cache-Control', cache_control)
+                self.end_headers()
+                return
+            
             self.send_response(status_code)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
-            # Add cache headers for Vercel edge caching (5 minutes)
-            self.send_header('Cache-Control', 'public, s-maxage=300, max-age=300')
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(response_data)))
             self.end_headers()
-            response_data = json.dumps(data).encode('utf-8')
             self.wfile.write(response_data)
         except Exception as e:
-            import traceback
             error_msg = str(e)
-            traceback_str = traceback.format_exc()
             print(f"Error in /api/rates handler: {error_msg}")
-            print(traceback_str)
+            traceback.print_exc()
             try:
                 self.send_response(500)
                 self.send_header('Content-Type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
-                error_response = json.dumps({"error": error_msg, "traceback": traceback_str}).encode('utf-8')
+                # The traceback stays in the logs; clients only get the message
+                error_response = orjson.dumps({"error": f"Internal server error: {error_msg}"})
                 self.wfile.write(error_response)
             except:
                 # If we can't send response, just log it
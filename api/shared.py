@@ -1,148 +1,251 @@
 """Shared utilities for Vercel serverless functions"""
 import os
-import sys
+import time
+import traceback
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+# Get API Key from environment variable
+FRED_API_KEY = os.getenv("FRED_API_KEY", "YOUR_API_KEY_HERE")
+FRED_OBSERVATIONS_URL = 'https://api.stlouisfed.org/fred/series/observations'
+
+# Per-series progress lines are only useful when debugging; errors and the one-line
+# summary are always logged
+DEBUG = os.getenv("YIELD_CURVE_DEBUG") == "1"
+
+# Module-level keep-alive session: the FRED calls share one TLS connection, and warm
+# invocations reuse it instead of handshaking again
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Today's FRED yields, reused by warm invocations until the day rolls over or the TTL lapses
+FRED_CACHE_TTL = 3600  # seconds
+_fred_cache = {"day": None, "ts": 0.0, "data": {}}
 
-# Fix for Python 3.12+ where distutils was removed
-# Provide distutils compatibility before importing packages that need it
+# A stalled upstream must not eat the function's whole time budget: each request gives
+# up after FETCH_TIMEOUT, and the fetch as a whole returns what it has by FETCH_DEADLINE
+FETCH_TIMEOUT = 3  # seconds, per HTTP request
+FETCH_DEADLINE = 5  # seconds, for FRED and Yahoo together
+
+# Long-lived pools, reused by warm invocations. FRED requests are capped at a few in
+# flight because /api/macro draws on the same FRED rate budget; the Yahoo batch gets
+# its own worker so it never waits on FRED requests. Requests abandoned at the deadline
+# can't be cancelled once running, so for up to FETCH_TIMEOUT the next invocation may
+# queue behind them in either pool.
+FRED_MAX_IN_FLIGHT = 4
+_FRED_POOL = ThreadPoolExecutor(max_workers=FRED_MAX_IN_FLIGHT, thread_name_prefix='fred-fetch')
+_YF_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='yf-fetch')
+
+# FRED API Treasury constant maturity rates (PRIMARY SOURCE)
+# Fetching all requested maturities: 1,3,6 mo and 1,3,5,7,20,30 yr
+# Note: 13M doesn't exist in FRED, removed it
+FRED_YIELD_SERIES = {
+    '1M': 'DGS1MO',   # 1-month
+    '3M': 'DGS3MO',   # 3-month
+    '6M': 'DGS6MO',   # 6-month
+    '1Y': 'DGS1',    # 1-year
+    '2Y': 'DGS2',    # 2-year
+    '3Y': 'DGS3',    # 3-year
+    '5Y': 'DGS5',    # 5-year
+    '7Y': 'DGS7',    # 7-year
+    '10Y': 'DGS10',  # 10-year
+    '20Y': 'DGS20',  # 20-year
+    '30Y': 'DGS30'   # 30-year
+}
+
+# Yahoo Finance tickers (as backup for maturities not available from FRED)
+YF_YIELD_TICKERS = {
+    '5Y': '^FVX',   # 5-year Treasury Note
+    '10Y': '^TNX',  # 10-year Treasury Note
+    '30Y': '^TYX'   # 30-year Treasury Bond
+}
+
+# Last-known curve shipped with the deployment, served when the live sources come back
+# with too few maturities to draw a curve; read once at import
+MIN_LIVE_MATURITIES = 3
 try:
-    import distutils
-except ImportError:
-    # Python 3.12+ - distutils was removed, use setuptools as replacement
+    with open(os.path.join(os.path.dirname(__file__), '_yield_curve_fallback.json'), 'rb') as f:
+        FALLBACK_YIELDS = orjson.loads(f.read())
+except (OSError, orjson.JSONDecodeError) as e:
+    print(f"Could not load fallback yield curve: {e}")
+    FALLBACK_YIELDS = {}
+
+def _fetch_fred_series(label, series_id, observation_start, observation_end):
+    """Latest value of one FRED series, or None if it could not be fetched"""
     try:
-        import setuptools
-        # Create a distutils module alias
-        sys.modules['distutils'] = setuptools
-        sys.modules['distutils.util'] = setuptools.util
-        sys.modules['distutils.version'] = setuptools.version
-    except ImportError:
-        # If setuptools is not available, create a minimal distutils stub
-        class DistutilsStub:
-            class util:
-                @staticmethod
-                def strtobool(val):
-                    val = val.lower()
-                    if val in ('y', 'yes', 't', 'true', 'on', '1'):
-                        return 1
-                    elif val in ('n', 'no', 'f', 'false', 'off', '0'):
-                        return 0
-                    else:
-                        raise ValueError(f"invalid truth value {val!r}")
-            
-            class version:
-                class LooseVersion:
-                    def __init__(self, v):
-                        self.v = v
-                    def __str__(self):
-                        return str(self.v)
+        response = SESSION.get(FRED_OBSERVATIONS_URL, params={
+            'series_id': series_id,
+            'api_key': FRED_API_KEY,
+            'file_type': 'json',
+            'observation_start': observation_start,
+            'observation_end': observation_end,
+            'sort_order': 'desc',
+        }, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
         
-        sys.modules['distutils'] = DistutilsStub()
-        sys.modules['distutils.util'] = DistutilsStub.util
-        sys.modules['distutils.version'] = DistutilsStub.version
+        # Newest first; FRED marks missing observations (holidays) with '.'
+        for obs in orjson.loads(response.content)['observations']:
+            if obs['value'] != '.':
+                value = float(obs['value'])
+                if DEBUG:
+                    print(f"✓ Successfully fetched {label} ({series_id}) from FRED: {value}")
+                return value
+        print(f"✗ No valid data for {label} ({series_id})")
+    except Exception as e:
+        print(f"✗ Error fetching {label} ({series_id}) from FRED: {str(e)}")
+    return None
 
-from datetime import datetime, timedelta
-import pandas_datareader.data as web
-import yfinance as yf
-import pandas as pd
+def _fetch_yf_latest(tickers):
+    """Latest close for each {label: ticker} from one batched yfinance download"""
+    # yfinance drags in pandas and friends; import it only when a Yahoo fallback is
+    # actually needed (a no-op after the first time)
+    import yfinance as yf
+    
+    latest = {}
+    try:
+        # One batched download for every ticker instead of a round trip each
+        hist = yf.download(list(tickers.values()), period="1d", group_by='ticker',
+                           progress=False, threads=True, timeout=FETCH_TIMEOUT)
+        for label, ticker in tickers.items():
+            try:
+                closes = hist[ticker]['Close'].dropna()
+                if not closes.empty:
+                    latest[label] = float(closes.iloc[-1])
+            except Exception as e:
+                print(f"Error fetching {label} ({ticker}) from yfinance: {e}")
+    except Exception as e:
+        print(f"Error fetching yields from yfinance: {e}")
+    return latest
 
-# Get API Key from environment variable
-FRED_API_KEY = os.getenv("FRED_API_KEY", "YOUR_API_KEY_HERE")
+def _submit_yf_fallback(have):
+    """Start the Yahoo batch for long-end maturities missing from have, or None if none are"""
+    needed = {label: ticker for label, ticker in YF_YIELD_TICKERS.items() if label not in have}
+    return _YF_POOL.submit(_fetch_yf_latest, needed) if needed else None
 
 def get_yield_curve():
     """Fetch yield curve data from multiple sources"""
+    return get_yield_curve_with_source()[0]
+
+def get_yield_curve_with_source():
+    """Return (yields, source); source is 'fallback' when the bundled curve was served"""
     data = {}
     
     try:
-        # FRED API Treasury constant maturity rates (PRIMARY SOURCE)
-        # Fetching all requested maturities: 1,3,6 mo and 1,3,5,7,20,30 yr
-        # Note: 13M doesn't exist in FRED, removed it
-        fred_series = {
-            '1M': 'DGS1MO',   # 1-month
-            '3M': 'DGS3MO',   # 3-month
-            '6M': 'DGS6MO',   # 6-month
-            '1Y': 'DGS1',    # 1-year
-            '2Y': 'DGS2',    # 2-year
-            '3Y': 'DGS3',    # 3-year
-            '5Y': 'DGS5',    # 5-year
-            '7Y': 'DGS7',    # 7-year
-            '10Y': 'DGS10',  # 10-year
-            '20Y': 'DGS20',  # 20-year
-            '30Y': 'DGS30'   # 30-year
-        }
+        # FRED publishes these once per business day, so a warm container reuses today's
+        # values for a while; Yahoo quotes move intraday and are fetched as needed
+        today = datetime.now().date()
+        fred_cached = (
+            _fred_cache["day"] == today
+            and time.monotonic() - _fred_cache["ts"] < FRED_CACHE_TTL
+        )
+        if fred_cached:
+            data.update(_fred_cache["data"])
+        # A cached set can be partial (a series errored or had no recent value); only
+        # those maturities are asked for again
+        fred_missing = {label: series_id for label, series_id in FRED_YIELD_SERIES.items() if label not in data}
+        
+        deadline = time.monotonic() + FETCH_DEADLINE
+        # Yahoo only backs up the long end. Its batch (and the yfinance/pandas import)
+        # starts as soon as FRED fails one of those maturities, overlapping the FRED
+        # requests still in flight, and never runs when FRED covers them
+        yf_future = None
         
         # Check if FRED API key is set
         api_key_set = FRED_API_KEY and FRED_API_KEY != "YOUR_API_KEY_HERE" and len(FRED_API_KEY) > 10
-        print(f"FRED_API_KEY check: {'SET' if api_key_set else 'NOT SET'} (length: {len(FRED_API_KEY) if FRED_API_KEY else 0})")
+        if DEBUG:
+            print(f"FRED_API_KEY check: {'SET' if api_key_set else 'NOT SET'} (length: {len(FRED_API_KEY) if FRED_API_KEY else 0})")
         
         # Fetch from FRED first (primary source)
-        if api_key_set:
+        if not fred_missing:
+            if DEBUG:
+                print(f"Using today's cached FRED yields ({len(data)} maturities)")
+        elif api_key_set:
+            futures = {}
+            fetched = {}
             try:
-                # Use today's date (not future dates)
-                end_date = datetime.now().date()
-                start_date = end_date - timedelta(days=30)  # Look back 30 days to ensure we get data
-                print(f"Fetching FRED data from {start_date} to {end_date}")
+                # Use today's date (not future dates), formatted once for every series
+                observation_end = today.isoformat()
+                observation_start = (today - timedelta(days=30)).isoformat()  # Look back 30 days to ensure we get data
+                if DEBUG:
+                    print(f"Fetching FRED data from {observation_start} to {observation_end}")
                 
-                for label, series_id in fred_series.items():
-                    try:
-                        df = web.DataReader(series_id, 'fred', start_date, end_date, api_key=FRED_API_KEY)
-                        if not df.empty:
-                            series_data = df[series_id].dropna()
-                            if len(series_data) > 0:
-                                data[label] = float(series_data.iloc[-1])
-                                print(f"✓ Successfully fetched {label} ({series_id}) from FRED: {data[label]}")
-                            else:
-                                print(f"✗ No valid data for {label} ({series_id}) - empty after dropna")
-                        else:
-                            print(f"✗ Empty dataframe for {label} ({series_id})")
-                    except Exception as e:
-                        print(f"✗ Error fetching {label} ({series_id}) from FRED: {str(e)}")
+                # Series are requested concurrently (up to FRED_MAX_IN_FLIGHT at a time)
+                futures = {
+                    _FRED_POOL.submit(_fetch_fred_series, label, series_id, observation_start, observation_end): label
+                    for label, series_id in fred_missing.items()
+                }
+                for future in as_completed(futures, timeout=max(0, deadline - time.monotonic())):
+                    label = futures[future]
+                    value = future.result()
+                    if value is not None:
+                        data[label] = fetched[label] = value
+                    elif yf_future is None and label in YF_YIELD_TICKERS:
+                        yf_future = _submit_yf_fallback(data)
+            except FuturesTimeoutError:
+                # Keep whatever arrived in time; the rest fall back to Yahoo or are omitted.
+                # Requests still queued are dropped so the next invocation doesn't wait on them
+                for future in futures:
+                    future.cancel()
+                print(f"✗ FRED fetch hit the {FETCH_DEADLINE}s deadline with {len(data)} series")
             except Exception as e:
                 print(f"✗ Error in FRED fetch loop: {str(e)}")
-                import traceback
                 traceback.print_exc()
+            finally:
+                # Cache whatever arrived, deadline or not; the missing series are asked for
+                # again next time. Topping up a cached set keeps its age, so the full set
+                # still expires on time.
+                if fetched:
+                    _fred_cache.update(
+                        day=today,
+                        ts=_fred_cache["ts"] if fred_cached else time.monotonic(),
+                        data=dict(data),
+                    )
         else:
             print("⚠ Warning: FRED_API_KEY not properly set, will use yfinance as fallback")
         
-        # Yahoo Finance tickers (as backup for maturities not available from FRED)
-        yf_tickers = {
-            '5Y': '^FVX',   # 5-year Treasury Note
-            '10Y': '^TNX',  # 10-year Treasury Note
-            '30Y': '^TYX'   # 30-year Treasury Bond
-        }
-        
-        # Fetch from yfinance only for maturities not already fetched from FRED
-        try:
-            for label, ticker in yf_tickers.items():
-                # Only use yfinance if FRED data is not available
-                if label not in data:
-                    try:
-                        tick = yf.Ticker(ticker)
-                        hist = tick.history(period="1d")
-                        if not hist.empty:
-                            data[label] = float(hist['Close'].iloc[-1])
-                            print(f"Fetched {label} from yfinance (FRED unavailable): {data[label]}")
-                    except Exception as e:
-                        print(f"Error fetching {label} ({ticker}) from yfinance: {e}")
-        except Exception as e:
-            print(f"Error fetching yields from yfinance: {e}")
+        # No key or a failed FRED loop: start the Yahoo batch now for whatever long-end
+        # maturities are still missing. FRED still wins wherever both returned a value.
+        if yf_future is None and time.monotonic() < deadline:
+            yf_future = _submit_yf_fallback(data)
+        yf_latest = {}
+        if yf_future:
+            try:
+                yf_latest = yf_future.result(timeout=max(0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                yf_future.cancel()
+                print(f"Error fetching yields from yfinance: no response within {FETCH_DEADLINE}s")
+        for label, value in yf_latest.items():
+            if label not in data:
+                data[label] = value
+                if DEBUG:
+                    print(f"Fetched {label} from yfinance (FRED unavailable): {value}")
         
         print(f"Total maturities fetched: {len(data)} - {list(data.keys())}")
     except Exception as e:
-        import traceback
         print(f"Error in get_yield_curve: {e}")
         traceback.print_exc()
-        # Return empty dict instead of raising - let caller handle it
     
-    return data
+    # Too little live data for a curve: serve the bundled last-known curve whole rather
+    # than mixing its dates with the few live points, and tell the caller it did so
+    if len(data) < MIN_LIVE_MATURITIES and FALLBACK_YIELDS:
+        print(f"Only {len(data)} live maturities, using bundled fallback yield curve")
+        return dict(FALLBACK_YIELDS), 'fallback'
+    
+    return data, 'live'
+
+# Every label get_yield_curve can return, mapped to its maturity in years
+MATURITY_YEARS = {
+    '1M': 1 / 12, '3M': 0.25, '6M': 0.5,
+    '1Y': 1.0, '2Y': 2.0, '3Y': 3.0, '5Y': 5.0, '7Y': 7.0,
+    '10Y': 10.0, '20Y': 20.0, '30Y': 30.0,
+}
 
 def maturity_to_years(maturity_str):
     """Convert maturity string to years for sorting"""
-    if maturity_str.endswith('W'):
-        return int(maturity_str[:-1]) / 52.0
-    elif maturity_str.endswith('M'):
-        return int(maturity_str[:-1]) / 12.0
-    elif maturity_str.endswith('Y'):
-        return float(maturity_str[:-1])
-    return 0.0
+    return MATURITY_YEARS.get(maturity_str, 0.0)
 
 def calculate_dv01(face_value, duration, yield_percent):
     """Calculate DV01"""
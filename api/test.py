@@ -1,5 +1,8 @@
 from http.server import BaseHTTPRequestHandler
-import json
+import orjson
+
+# The body never changes, so it is encoded once at import
+RESPONSE_BODY = orjson.dumps({"message": "API is working", "test": True})
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -9,8 +12,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        response = json.dumps({"message": "API is working", "test": True})
-        self.wfile.write(response.encode('utf-8'))
+        self.wfile.write(RESPONSE_BODY)
         return
     
     def do_OPTIONS(self):